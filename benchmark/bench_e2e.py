@@ -0,0 +1,310 @@
+"""End-to-end benchmark over synthetic projects.
+
+Generate synthetic projects with a range of file counts, imports per file,
+requirement counts, requirements include depth and setup styles, and
+measure for every project:
+
+- cold start: wall time of the standalone checker run on a single file in
+  a fresh Python interpreter (import, requirements resolution and check),
+- index: requirements resolution time in an already running interpreter,
+- per-file latency of the Flake8Checker.run() (mean, median and 95th
+  percentile),
+- peak memory allocated during requirements resolution and checking.
+
+Results are written in the JSON format, so they can be compared between
+commits. Run from the repository root directory:
+
+    python benchmark/bench_e2e.py --output before.json
+    git checkout other-commit
+    python benchmark/bench_e2e.py --output after.json --compare before.json
+
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from flake8_requirements.checker import Flake8Checker
+from flake8_requirements.checker import __version__
+from flake8_requirements.cli import OptionManager
+
+# Setup styles: requirements (requirements.txt with -r includes), pyproject
+# (PEP 621 metadata), setup-cfg, setup-static (setup.py with literals, which
+# can be analyzed statically) and setup-dynamic (setup.py which has to be
+# evaluated).
+SCENARIOS = [
+    dict(name="small", files=100, imports=5, requirements=10, depth=1,
+         setup="requirements"),
+    dict(name="many-files", files=2000, imports=10, requirements=50, depth=1,
+         setup="requirements"),
+    dict(name="many-imports", files=200, imports=100, requirements=50,
+         depth=1, setup="pyproject"),
+    dict(name="pinned", files=200, imports=10, requirements=2000, depth=4,
+         setup="requirements"),
+    dict(name="setup-cfg", files=200, imports=10, requirements=50, depth=1,
+         setup="setup-cfg"),
+    dict(name="setup-static", files=200, imports=10, requirements=50,
+         depth=1, setup="setup-static"),
+    dict(name="setup-dynamic", files=200, imports=10, requirements=50,
+         depth=1, setup="setup-dynamic"),
+]
+
+# Metrics reported for every scenario, the lower the better.
+METRICS = (
+    "cold_start",
+    "index",
+    "run_mean",
+    "run_p50",
+    "run_p95",
+    "peak_memory",
+)
+
+STDLIB_MODULES = ("os", "sys", "json", "collections", "typing", "re")
+
+
+def write(root, path, content):
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def generate_project(root, files, imports, requirements, depth, setup):
+    """Generate synthetic project in the given directory."""
+    rnd = random.Random(0)
+    projects = ["synthetic-lib-{}".format(i) for i in range(requirements)]
+    specs = ["{} == 1.{}.0".format(x, i) for i, x in enumerate(projects)]
+
+    if setup == "requirements":
+        # Split requirements between files included one from another.
+        chunk = len(specs) // depth + 1
+        for i in range(depth):
+            lines = specs[i * chunk:(i + 1) * chunk]
+            if i + 1 < depth:
+                lines.append("-r requirements-{}.txt".format(i + 1))
+            name = "requirements-{}.txt".format(i) if i else "requirements.txt"
+            write(root, name, "\n".join(lines) + "\n")
+    elif setup == "pyproject":
+        write(root, "pyproject.toml", "\n".join((
+            "[project]",
+            'name = "synthetic"',
+            "dependencies = [",
+            *('  "{}",'.format(x) for x in specs),
+            "]",
+        )) + "\n")
+    elif setup == "setup-cfg":
+        write(root, "setup.cfg", "\n".join((
+            "[metadata]",
+            "name = synthetic",
+            "[options]",
+            "install_requires =",
+            *("  {}".format(x) for x in specs),
+        )) + "\n")
+    elif setup in ("setup-static", "setup-dynamic"):
+        requires = repr(specs)
+        if setup == "setup-dynamic":
+            write(root, "requires.txt", "\n".join(specs) + "\n")
+            requires = "[x.strip() for x in open('requires.txt') if x.strip()]"
+        write(root, "setup.py", "\n".join((
+            "from setuptools import setup",
+            "REQUIRES = {}".format(requires),
+            "setup(",
+            "    name='synthetic',",
+            "    version='1.0',",
+            "    author='Author',",
+            "    packages=['synthetic'],",
+            "    install_requires=REQUIRES,",
+            ")",
+        )) + "\n")
+    else:
+        raise ValueError("Unknown setup style: {}".format(setup))
+
+    modules = [x.replace("-", "_") for x in projects]
+    paths = []
+    for i in range(files):
+        lines = []
+        for j in range(imports):
+            kind = rnd.random()
+            if kind < 0.7:
+                stmt = "import {}".format(rnd.choice(modules))
+            elif kind < 0.8:
+                stmt = "from {}.sub import name".format(rnd.choice(modules))
+            elif kind < 0.95:
+                stmt = "import {}".format(rnd.choice(STDLIB_MODULES))
+            else:
+                stmt = "from synthetic import module_{}".format(j)
+            # Put some imports into function bodies.
+            if j % 2:
+                stmt = "def function_{}():\n    {}\n    return 0".format(
+                    j, stmt)
+            lines.append(stmt)
+        path = os.path.join("synthetic", "module_{}.py".format(i))
+        write(root, path, "\n".join(lines) + "\n")
+        paths.append(path)
+    write(root, os.path.join("synthetic", "__init__.py"), "")
+    return paths
+
+
+def get_options(scenario):
+    parser = argparse.ArgumentParser()
+    Flake8Checker.add_options(OptionManager(parser))
+    options = parser.parse_args([
+        "--requirements-max-depth", str(scenario["depth"])])
+    options.select = ["I900"]
+    options.extend_select = []
+    options.output_file = None
+    options.benchmark = False
+    return options
+
+
+def run_checks(options, trees):
+    Flake8Checker.parse_options(options)
+    latencies = []
+    for path, tree in trees:
+        start = time.perf_counter()
+        list(Flake8Checker(tree, path).run())
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def measure(scenario, repeat):
+    """Generate project for the given scenario and measure it."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as root:
+        root = os.path.realpath(root)
+        params = {k: v for k, v in scenario.items() if k != "name"}
+        paths = generate_project(root, **params)
+        os.chdir(root)
+        try:
+            trees = []
+            for path in paths:
+                with open(path, "rb") as f:
+                    trees.append((path, ast.parse(f.read(), path)))
+            options = get_options(scenario)
+
+            cold_start = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                subprocess.run(
+                    [sys.executable, "-m", "flake8_requirements", "-j", "1",
+                     "--requirements-max-depth", str(scenario["depth"]),
+                     paths[0]],
+                    stdout=subprocess.DEVNULL)
+                cold_start.append(time.perf_counter() - start)
+
+            index = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                Flake8Checker.parse_options(options)
+                index.append(time.perf_counter() - start)
+
+            latencies = min(
+                (run_checks(options, trees) for _ in range(repeat)),
+                key=sum)
+
+            tracemalloc.start()
+            run_checks(options, trees)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        finally:
+            os.chdir(cwd)
+            Flake8Checker.invalidate()
+
+    latencies.sort()
+    return dict(
+        scenario,
+        cold_start=min(cold_start),
+        index=min(index),
+        run_mean=statistics.mean(latencies),
+        run_p50=statistics.median(latencies),
+        run_p95=latencies[int(len(latencies) * 0.95)],
+        peak_memory=peak_memory,
+    )
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_value(metric, value):
+    if metric == "peak_memory":
+        return "{:.1f} MiB".format(value / 2**20)
+    return "{:.3f} ms".format(value * 1000)
+
+
+def print_results(results, baseline=None):
+    baseline = {x["name"]: x for x in (baseline or {}).get("results", [])}
+    for result in results:
+        print(result["name"], file=sys.stderr)
+        for metric in METRICS:
+            line = "  {:<12} {:>14}".format(
+                metric, format_value(metric, result[metric]))
+            if (base := baseline.get(result["name"])) and base[metric]:
+                line += "  {:+.1f}%".format(
+                    (result[metric] / base[metric] - 1) * 100)
+            print(line, file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--scenario", action="append", choices=[x["name"] for x in SCENARIOS],
+        help="Run selected scenario only (might be given more than once).")
+    parser.add_argument(
+        "--scale", type=float, default=1.0,
+        help="Scale number of files in every scenario (e.g. 0.1).")
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="Number of measurements (the best one is reported).")
+    parser.add_argument(
+        "--output",
+        help="Write JSON results to the given file instead of stdout.")
+    parser.add_argument(
+        "--compare",
+        help="Print relative change against results stored in given file.")
+    args = parser.parse_args()
+
+    results = []
+    for scenario in SCENARIOS:
+        if args.scenario and scenario["name"] not in args.scenario:
+            continue
+        scenario = dict(scenario)
+        scenario["files"] = max(1, int(scenario["files"] * args.scale))
+        results.append(measure(scenario, args.repeat))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    report = json.dumps({
+        "version": __version__,
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }, indent=2) + "\n"
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        sys.stdout.write(report)
+
+
+if __name__ == "__main__":
+    main()
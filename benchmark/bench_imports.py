@@ -0,0 +1,70 @@
+"""Benchmark import statements collection.
+
+Compare the ImportVisitor (which walks statement bodies only) with the
+previous implementation based on the ast.NodeVisitor, which visits every
+node of the tree. Run from the repository root directory:
+
+    python benchmark/bench_imports.py --statements 20000
+
+"""
+import argparse
+import ast
+import timeit
+
+from flake8_requirements.checker import ImportVisitor
+
+
+class NodeVisitorImportVisitor(ImportVisitor, ast.NodeVisitor):
+    """Import statement visitor based on the full tree traversal."""
+
+    visit = ast.NodeVisitor.visit
+
+
+def generate_module(statements):
+    """Generate big module with imports scattered across the code."""
+    lines = []
+    for i in range(statements // 10):
+        lines.extend((
+            "import os",
+            "from mod{} import name".format(i % 50),
+            "def function{}(a, b=None):".format(i),
+            "    if a and b:",
+            "        from collections import OrderedDict",
+            "        return OrderedDict((k, [v] * 2) for k, v in a.items())",
+            "    data = {{'key': [1, 2, 3], 'value': (a, b, {})}}".format(i),
+            "    return [x ** 2 for x in range(10) if x % 2] + [data]",
+            "VALUE{} = function{}({{'x': 1}}, b=[1, 2, 3])".format(i, i),
+            "",
+        ))
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--statements", type=int, default=20000,
+        help="Number of lines of the generated module.")
+    parser.add_argument(
+        "--repeat", type=int, default=5,
+        help="Number of measurements (the best one is reported).")
+    args = parser.parse_args()
+
+    tree = ast.parse(generate_module(args.statements))
+    imports = ImportVisitor(tree).imports
+    assert imports == NodeVisitorImportVisitor(tree).imports
+
+    print("Module with {} lines and {} imports".format(
+        args.statements, len(imports)))
+    results = {}
+    for name, visitor in (
+            ("ast.NodeVisitor", NodeVisitorImportVisitor),
+            ("ImportVisitor", ImportVisitor)):
+        results[name] = min(timeit.repeat(
+            lambda: visitor(tree), number=1, repeat=args.repeat))
+        print("{:<16} {:8.2f} ms".format(name, results[name] * 1000))
+    print("Speed-up: {:.1f}x".format(
+        results["ast.NodeVisitor"] / results["ImportVisitor"]))
+
+
+if __name__ == "__main__":
+    main()
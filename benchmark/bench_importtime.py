@@ -0,0 +1,39 @@
+"""Benchmark import time of the plugin.
+
+Report cumulative time of "import flake8_requirements" as measured by the
+Python "-X importtime" option, which is the overhead added to every flake8
+run. Run from the repository root directory:
+
+    python benchmark/bench_importtime.py --repeat 5
+
+"""
+import argparse
+import subprocess
+import sys
+
+
+def measure():
+    """Measure import time of the plugin in a fresh interpreter."""
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime",
+         "-c", "import flake8_requirements"],
+        capture_output=True, check=True, text=True)
+    for line in p.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | package"
+        fields = [x.strip() for x in line.split("|")]
+        if fields[-1] == "flake8_requirements":
+            return int(fields[1]) / 1e6
+    raise RuntimeError("Import time of flake8_requirements not reported")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    elapsed = [measure() for _ in range(args.repeat)]
+    print("import flake8_requirements: {:.1f} ms (best of {})".format(
+        min(elapsed) * 1e3, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
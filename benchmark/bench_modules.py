@@ -0,0 +1,97 @@
+"""Benchmark modules lookup structure.
+
+Compare memory usage and lookup time of the flat ModuleSet with the
+previous radix-tree-like implementation, which allocated one nested
+dictionary per submodule. Run from the repository root directory:
+
+    python benchmark/bench_modules.py --scan-host-site-packages
+
+"""
+import argparse
+import timeit
+import tracemalloc
+
+from flake8_requirements.checker import Flake8Checker
+from flake8_requirements.checker import ModuleSet
+from flake8_requirements.checker import modsplit
+
+
+class NestedModuleSet(dict):
+    """Radix-tree-like structure for modules lookup."""
+
+    requirement = None
+
+    def add(self, module, requirement):
+        for mod in module:
+            self = self.setdefault(mod, NestedModuleSet())
+        self.requirement = requirement
+
+    def lookup(self, module):
+        for mod in module:
+            self = self.get(mod)
+            if self is None:
+                return None
+            if self.requirement is not None:
+                return self.requirement
+        return None
+
+
+def get_modules(scan_host_site_packages):
+    """Get (module, project) pairs of known 3rd party projects."""
+    mapping = dict(Flake8Checker.get_known_3rd_parties())
+    if scan_host_site_packages:
+        mapping.update(Flake8Checker.discover_host_3rd_party_modules())
+    return [
+        (modsplit(module), project)
+        for project, modules in sorted(mapping.items())
+        for module in modules
+    ]
+
+
+def build(cls, modules):
+    mods = cls()
+    for module, project in modules:
+        mods.add(module, project)
+    return mods
+
+
+def measure_memory(cls, modules):
+    tracemalloc.start()
+    mods = build(cls, modules)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del mods
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--scan-host-site-packages", action="store_true",
+        help="Add modules of projects installed on the host.")
+    parser.add_argument(
+        "--repeat", type=int, default=5,
+        help="Number of measurements (the best one is reported).")
+    args = parser.parse_args()
+
+    modules = get_modules(args.scan_host_site_packages)
+    # Look up every registered module, its submodule and some misses.
+    queries = [x for x, _ in modules]
+    queries += [x + ("submodule",) for x, _ in modules]
+    queries += [("missing", str(i)) for i in range(len(modules))]
+
+    print("Modules: {}, lookups per run: {}".format(
+        len(modules), len(queries)))
+    print("{:<16} {:>10} {:>12}".format("", "memory", "lookup"))
+    for cls in (NestedModuleSet, ModuleSet):
+        mods = build(cls, modules)
+        memory = measure_memory(cls, modules)
+        elapsed = min(timeit.repeat(
+            lambda: [mods.lookup(x) for x in queries],
+            number=10, repeat=args.repeat)) / 10
+        print("{:<16} {:>7.0f} kB {:>9.2f} ms".format(
+            cls.__name__, memory / 1024, elapsed * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import os
+import time
+from collections import OrderedDict
+from collections import namedtuple
+from logging import getLogger
+
+LOG = getLogger('flake8.plugin.requirements')
+
+
+def file_fingerprint(path):
+    """Get (mtime, size) fingerprint of the given file."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        # Record missing files as well, so creating such a file will
+        # invalidate cache entries which depend on its absence.
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class MemoCache(object):
+    """In-memory cache with optional LRU eviction.
+
+    Every entry is assigned to a project root directory (or None, if it does
+    not depend on any project), so entries of a single project can be
+    invalidated without touching the rest of the cache.
+
+    """
+
+    # Cache statistics returned by the info() method.
+    Info = namedtuple('Info', ('hits', 'misses', 'size', 'maxsize'))
+
+    def __init__(self, maxsize=None):
+        """Initialize cache, by default the cache size is not bounded."""
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Get cached value and mark it as the most recently used one."""
+        try:
+            value = self.entries[key][1]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        if self.maxsize is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def set(self, key, value, root_dir=None):
+        """Store value evicting the least recently used entries."""
+        self.entries[key] = root_dir, value
+        if self.maxsize is not None:
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def resize(self, maxsize):
+        """Change the size bound of the cache (None for unbounded)."""
+        self.maxsize = maxsize
+        if maxsize is not None:
+            while len(self.entries) > maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, root_dir):
+        """Remove all entries assigned to the given root directory."""
+        for key in [k for k, v in self.entries.items() if v[0] == root_dir]:
+            del self.entries[key]
+
+    def clear(self):
+        """Remove all entries and reset statistics."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """Get cache statistics."""
+        return self.Info(
+            self.hits, self.misses, len(self.entries), self.maxsize)
+
+
+class IndexCache(object):
+    """Persistent cache of resolved requirements indexes.
+
+    Every cache entry is stored in a separate JSON file. Entries are named
+    (e.g. by the project root directory), keyed by the digest of resolution
+    options, and are valid as long as none of the source files used for the
+    resolution has changed (according to its modification time and size).
+
+    """
+
+    def __init__(self, path):
+        """Initialize persistent cache stored in the given directory."""
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+    def get_entry_path(self, name):
+        import hashlib
+        digest = hashlib.sha256(name.encode())
+        return os.path.join(self.path, digest.hexdigest()[:32] + ".json")
+
+    def load(self, name, key):
+        """Load cached data, return None if there is no valid entry."""
+        import json
+        try:
+            with open(self.get_entry_path(name)) as f:
+                entry = json.load(f)
+        except (IOError, ValueError) as e:
+            LOG.debug("Couldn't load cached index: %s", e)
+            self.misses += 1
+            return None
+        if entry.get('key') != key:
+            self.misses += 1
+            return None
+        for path, fingerprint in entry.get('sources', {}).items():
+            if file_fingerprint(path) != fingerprint:
+                LOG.debug("Cached index outdated: %s", path)
+                self.misses += 1
+                return None
+        self.hits += 1
+        return entry.get('data')
+
+    def store(self, name, key, data, sources):
+        """Store data resolved from given source files."""
+        import json
+        import tempfile
+        entry = {
+            'key': key,
+            'sources': {x: file_fingerprint(x) for x in sources},
+            'data': data,
+        }
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            # Write to a temporary file and move it in place, so concurrent
+            # flake8 runs will never see partially written entries.
+            fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        except OSError as e:
+            LOG.debug("Couldn't store cached index: %s", e)
+            return
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp, self.get_entry_path(name))
+        except (OSError, TypeError, ValueError) as e:
+            LOG.debug("Couldn't store cached index: %s", e)
+            os.unlink(tmp)
+
+
+class ImportStore(object):
+    """Persistent store of imports extracted from Python files.
+
+    Imports depend on the file content only, so they are stored in a SQLite
+    database keyed by the content hash. The database is used in the WAL mode,
+    so concurrent worker processes can read it while others are writing.
+
+    """
+
+    # Entries stored more than this number of seconds ago are removed when
+    # the database is opened, so imports of no longer existing file versions
+    # do not accumulate indefinitely.
+    max_age = 30 * 24 * 60 * 60
+
+    def __init__(self, path):
+        """Initialize store kept in the given database file."""
+        self.path = path
+        # SQLite connections shall not be used across fork, so every process
+        # opens its own one. Connections inherited from the parent process
+        # are kept open, because closing them might affect the parent.
+        self.connections = {}
+
+    def connect(self):
+        if (db := self.connections.get(os.getpid())) is None:
+            import sqlite3
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS imports (key BLOB PRIMARY KEY, "
+                "imports TEXT NOT NULL, stored INTEGER NOT NULL)")
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS imports_stored "
+                "ON imports (stored)")
+            db.execute(
+                "DELETE FROM imports WHERE stored < ?",
+                (int(time.time()) - self.max_age,))
+            self.connections[os.getpid()] = db
+        return db
+
+    @staticmethod
+    def get_key(source, version):
+        """Get store key of the given source code (bytes).
+
+        The version shall identify the import extraction algorithm (e.g.
+        plug-in and Python versions), so stored imports are not reused if
+        the algorithm changes.
+
+        """
+        import hashlib
+        digest = hashlib.sha256(version.encode() + b"\0")
+        digest.update(source)
+        return digest.digest()
+
+    def load(self, key):
+        """Load stored imports, return None if there is no such entry."""
+        import json
+        import sqlite3
+        try:
+            row = self.connect().execute(
+                "SELECT imports FROM imports WHERE key = ?",
+                (key,)).fetchone()
+        except (OSError, sqlite3.Error) as e:
+            LOG.debug("Couldn't load stored imports: %s", e)
+            return None
+        return None if row is None else json.loads(row[0])
+
+    def store(self, key, imports):
+        """Store JSON-serializable list of imports."""
+        import json
+        import sqlite3
+        try:
+            self.connect().execute(
+                "INSERT OR REPLACE INTO imports VALUES (?, ?, ?)",
+                (key, json.dumps(imports, separators=(",", ":")),
+                 int(time.time())))
+        except (OSError, sqlite3.Error) as e:
+            LOG.debug("Couldn't store imports: %s", e)
@@ -1,22 +1,16 @@
 import ast
+import atexit
 import os
 import re
-import site
 import sys
 from collections import namedtuple
-from configparser import ConfigParser
 from functools import wraps
 from logging import getLogger
+from time import perf_counter
 
-from packaging.requirements import Requirement
-
-if sys.version_info >= (3, 11):
-    import tomllib
-else:
-    import tomli as tomllib
-
-from .modules import KNOWN_3RD_PARTIES
-from .modules import STDLIB_PY3
+from .cache import ImportStore
+from .cache import IndexCache
+from .cache import MemoCache
 
 # NOTE: Keep in sync with pyproject.toml file.
 __version__ = "2.3.0"
@@ -29,23 +23,78 @@ ERRORS = {
     'I901': "I901 '{pkg}' required but not used",
 }
 
-STDLIB = set()
-STDLIB.update(STDLIB_PY3)
-
 
 def memoize(f):
-    """Cache value returned by the function."""
+    """Cache value returned by the function.
+
+    Cached values of class methods are assigned to the class' root directory
+    (if any), so they can be invalidated with memoize.cache.invalidate().
+
+    """
+    missing = object()
+
     @wraps(f)
     def w(*args, **kw):
-        k = (f, repr(args), repr(kw))
-        if k not in memoize.mem:
-            memoize.mem[k] = f(*args, **kw)
-        return memoize.mem[k]
+        k = (f, args, tuple(sorted(kw.items()))) if kw else (f, args)
+        v = memoize.cache.get(k, missing)
+        if v is missing:
+            v = f(*args, **kw)
+            root_dir = getattr(args[0], 'root_dir', None) if args else None
+            memoize.cache.set(k, v, root_dir)
+        return v
     return w
 
 
 # Initialize cache memory block.
-memoize.mem = {}
+memoize.cache = MemoCache()
+
+
+def timed(f):
+    """Record wall time and number of calls of the function.
+
+    Statistics are recorded only if the timed.stats is set, otherwise the
+    function is called directly.
+
+    """
+    name = f.__qualname__
+
+    @wraps(f)
+    def w(*args, **kw):
+        if (stats := timed.stats) is None:
+            return f(*args, **kw)
+        start = perf_counter()
+        try:
+            return f(*args, **kw)
+        finally:
+            stats.add_time(name, perf_counter() - start)
+    return w
+
+
+# Statistics are disabled by default.
+timed.stats = None
+
+
+def get_stdlib_modules(version=None):
+    """Get standard library modules of the given Python version."""
+    if version not in get_stdlib_modules.mem:
+        # Use the list provided by the interpreter if available.
+        if version is None and hasattr(sys, 'stdlib_module_names'):
+            modules = sys.stdlib_module_names | {"__main__", "test"}
+        else:
+            from .modules import STDLIB_PY3
+            from .modules import STDLIB_PY3_CHANGES
+            modules = set(STDLIB_PY3)
+            for v, (added, removed) in sorted(STDLIB_PY3_CHANGES.items()):
+                if v > (version or sys.version_info[:2]):
+                    break
+                modules.update(added)
+                modules.difference_update(removed)
+        get_stdlib_modules.mem[version] = frozenset(modules)
+    return get_stdlib_modules.mem[version]
+
+
+# Initialize cache memory block.
+get_stdlib_modules.mem = {}
 
 
 def modsplit(module):
@@ -53,6 +102,11 @@ def modsplit(module):
     return tuple(module.split("."))
 
 
+def canonicalize(project):
+    """Normalize project name in accordance with PEP 503."""
+    return re.sub(r"[-_.]+", "-", project).lower()
+
+
 def project2modules(project):
     """Convert project name into auto-detected module names."""
     # Name unification in accordance with PEP 426.
@@ -87,6 +141,82 @@ def joinlines(lines):
         yield joined_line
 
 
+class LazyRequirement(object):
+    """Requirement which is parsed on the first use.
+
+    The project name is given by the caller (e.g. extracted with a regular
+    expression), and the requirement string is parsed by the packaging
+    library only when any other Requirement attribute (e.g. specifier) is
+    accessed. This also postpones the import of the packaging library.
+
+    """
+
+    def __init__(self, requirement_string, name):
+        self.name = name
+        self.requirement_string = requirement_string
+        self.requirement = None
+
+    def get_requirement(self):
+        """Get fully parsed requirement."""
+        if self.requirement is None:
+            from packaging.requirements import Requirement
+            try:
+                self.requirement = Requirement(self.requirement_string)
+            except Exception:
+                # Keep the project name even if the version specifier is not
+                # valid, e.g. due to the wildcard used with ">=" operator.
+                self.requirement = Requirement(self.name)
+        return self.requirement
+
+    def __getattr__(self, attr):
+        # This method is called for not initialized attributes only.
+        if attr.startswith("__") or attr == "requirement":
+            raise AttributeError(attr)
+        return getattr(self.get_requirement(), attr)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyRequirement):
+            other = other.get_requirement()
+        return self.get_requirement() == other
+
+    def __hash__(self):
+        return hash(self.get_requirement())
+
+    def __repr__(self):
+        return "<LazyRequirement({!r})>".format(self.requirement_string)
+
+    def __str__(self):
+        return str(self.get_requirement())
+
+
+_requirement_match_simple = re.compile(r"""
+    ([A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)  # project name
+    (?:\s*\[\s*[\w.-]+(?:\s*,\s*[\w.-]+)*\s*\])?  # extras
+    (?:\s*(?:~=|===?|!=|<=|>=|<|>)\s*[0-9][\w.*+!-]*  # version specifiers
+        (?:\s*,\s*(?:~=|===?|!=|<=|>=|<|>)\s*[0-9][\w.*+!-]*)*)?
+    \s*$""", re.VERBOSE).match
+
+
+@memoize
+def load_requirement(line):
+    """Create Requirement object from the requirement string.
+
+    Requirements which consist of the project name with optional extras and
+    version specifiers (the vast majority of requirements, e.g. all lines of
+    pinned requirements files) are recognized with a regular expression and
+    their full parsing is postponed. If the string is not a valid
+    requirement, None is returned.
+
+    """
+    if match := _requirement_match_simple(line):
+        return LazyRequirement(line, match.group(1))
+    from packaging.requirements import Requirement
+    try:
+        return Requirement(line)
+    except Exception:
+        return None
+
+
 def parse_requirements(lines):
     """Parse requirement strings into Requirement objects."""
     for line in lines:
@@ -95,23 +225,47 @@ def parse_requirements(lines):
         # Skip empty lines and lines that start with options
         if not line or line.startswith('-'):
             continue
-        try:
-            yield Requirement(line)
-        except Exception:
-            continue
+        if (requirement := load_requirement(line)) is not None:
+            yield requirement
+
 
+class ImportVisitor(object):
+    """Import statement visitor.
 
-class ImportVisitor(ast.NodeVisitor):
-    """Import statement visitor."""
+    Import statements might appear in statement bodies only, so contrary to
+    the ast.NodeVisitor, this visitor does not descend into expressions. The
+    tree is walked iteratively, so deeply nested (e.g. generated) code does
+    not hit the recursion limit.
+
+    """
 
     # Convenience structure for storing import statement.
     Import = namedtuple('Import', ('line', 'offset', 'module'))
 
+    # Node fields which might contain statements: bodies of compound
+    # statements, exception handlers and match cases.
+    body_fields = ('body', 'handlers', 'orelse', 'finalbody', 'cases')
+
     def __init__(self, tree):
         """Initialize import statement visitor."""
         self.imports = []
         self.visit(tree)
 
+    def visit(self, tree):
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, ast.Import):
+                self.visit_Import(node)
+            elif isinstance(node, ast.ImportFrom):
+                self.visit_ImportFrom(node)
+            else:
+                children = []
+                for field in self.body_fields:
+                    children.extend(getattr(node, field, ()))
+                # Visit statements in the source code order.
+                stack.extend(reversed(children))
+
     def visit_Import(self, node):
         self.imports.append(ImportVisitor.Import(
             node.lineno,
@@ -187,10 +341,22 @@ class SetupVisitor(ast.NodeVisitor):
         'zip_safe': 0.6,
     }
 
+    # Keywords required for requirements resolution.
+    static_attributes = (
+        'name',
+        'install_requires',
+        'extras_require',
+        'setup_requires',
+        'tests_require',
+    )
+
     def __init__(self, tree, cwd):
         """Initialize package setup visitor."""
         self.redirected = False
         self.keywords = {}
+        self.calls = []
+        # Whether setup.py was evaluated in this process.
+        self.evaluated = False
 
         # Find setup() call and redirect it.
         self.visit(tree)
@@ -198,6 +364,11 @@ class SetupVisitor(ast.NodeVisitor):
         if not self.redirected:
             return
 
+        # Try to get keywords without executing setup.py file.
+        if (keywords := self.get_static_keywords(tree)) is not None:
+            self.keywords = keywords
+            return
+
         def setup(**kw):
             """Setup() arguments hijacking."""
             self.keywords = kw
@@ -208,6 +379,7 @@ class SetupVisitor(ast.NodeVisitor):
         #      for OUR Python instance (we're changing our own sys.path)!
         sys.path.insert(0, cwd)
 
+        self.evaluated = True
         try:
             tree = ast.fix_missing_locations(tree)
             eval(compile(tree, "<str>", mode='exec'), {
@@ -227,6 +399,90 @@ class SetupVisitor(ast.NodeVisitor):
         # Restore import search path.
         sys.path.pop(0)
 
+    @classmethod
+    def from_keywords(cls, keywords):
+        """Create visitor with setup() keywords captured elsewhere."""
+        self = cls.__new__(cls)
+        self.redirected = keywords is not None
+        self.keywords = keywords or {}
+        self.evaluated = False
+        return self
+
+    @staticmethod
+    def evaluate_isolated(source, cwd, timeout):
+        """Evaluate setup.py source code in a separate process.
+
+        On success, this function returns a dictionary with JSON-serializable
+        setup() keywords (None if the setup() call was not captured) and the
+        list of project files opened during the evaluation. If evaluation
+        fails or does not finish in the given time, None is returned.
+
+        """
+        import json
+        import subprocess
+        script = (
+            "from flake8_requirements.checker import SetupVisitor; "
+            "SetupVisitor.evaluate_isolated_main()")
+        try:
+            p = subprocess.run(
+                [sys.executable, "-c", script, os.path.abspath(cwd)],
+                input=source.encode(),
+                capture_output=True,
+                cwd=cwd or None,
+                timeout=timeout)
+        except subprocess.TimeoutExpired:
+            LOG.error("Couldn't evaluate setup.py: Timeout after %ss", timeout)
+            return None
+        try:
+            return json.loads(p.stdout)
+        except ValueError:
+            LOG.error("Couldn't evaluate setup.py: %s", p.stderr.decode(
+                errors='replace').strip())
+            return None
+
+    @staticmethod
+    def evaluate_isolated_main():
+        """Entry point of the isolated setup.py evaluation process."""
+        import json
+        root = sys.argv[1]
+        source = sys.stdin.buffer.read().decode()
+        # Keep our standard output clean from setup.py prints.
+        output = os.fdopen(os.dup(1), "w")
+        os.dup2(2, 1)
+
+        def serialize(value):
+            if isinstance(value, (set, frozenset)):
+                return sorted(value)
+            raise TypeError(type(value))
+
+        # Record project files (e.g. README, requirements or version modules)
+        # opened during the evaluation, which might alter setup() keywords.
+        # Audit hooks can not be removed, so the hook shall be installed in
+        # this short-lived process only.
+        files = set()
+        prefix = os.path.join(os.path.abspath(root), "")
+
+        def record_opened_files(event, args):
+            if event == "open" and isinstance(args[0], str):
+                if (path := os.path.abspath(args[0])).startswith(prefix):
+                    files.add(path)
+
+        sys.addaudithook(record_opened_files)
+        setup = SetupVisitor(ast.parse(source), root)
+        keywords = {}
+        for k, v in setup.keywords.items():
+            try:
+                keywords[k] = json.loads(json.dumps(v, default=serialize))
+            except (TypeError, ValueError):
+                # Skip keywords which are not needed for requirements
+                # resolution anyway (e.g. cmdclass or ext_modules).
+                continue
+        json.dump({
+            'keywords': keywords if setup.redirected else None,
+            'files': sorted(files),
+        }, output)
+        output.close()
+
     def get_requirements(
             self, install=True, extras=True, setup=False, tests=False):
         """Get package requirements."""
@@ -285,28 +541,142 @@ class SetupVisitor(ast.NodeVisitor):
             return
 
         # Redirect call to our setup() tap function.
+        self.calls.append((node, node.func))
         node.func = ast.Name(id='__f8r_setup', ctx=node.func.ctx)
         self.redirected = True
 
+    def get_static_keywords(self, tree):
+        """Get setup() keywords using static analysis.
+
+        This method succeeds only if setup() imported from setuptools (or
+        distutils) is called once with literal values (or module-level
+        constants) for all keywords required for requirements resolution.
+        Otherwise, None is returned.
+
+        """
+        if len(self.calls) != 1:
+            return None
+        node, func = self.calls[0]
+
+        # Names under which setuptools.setup() is available.
+        setup_names = set()
+        for stmt in tree.body:
+            if isinstance(stmt, ast.ImportFrom) and stmt.module in (
+                    "setuptools", "distutils.core"):
+                setup_names.update(
+                    x.asname or x.name for x in stmt.names
+                    if x.name == "setup")
+            if isinstance(stmt, ast.Import):
+                setup_names.update(
+                    (x.asname or x.name) + ".setup" for x in stmt.names
+                    if x.name == "setuptools")
+        if isinstance(func, ast.Attribute) and isinstance(
+                func.value, ast.Name):
+            func = ast.Name(id=func.value.id + "." + func.attr)
+        if not isinstance(func, ast.Name) or func.id not in setup_names:
+            return None
+
+        # Collect names assigned once at the module level, which are not
+        # accessed with attributes or subscripts (e.g. REQUIRES.append()).
+        stores = {}
+        mutated = set()
+        for n in ast.walk(tree):
+            if isinstance(n, ast.Name) and not isinstance(n.ctx, ast.Load):
+                stores[n.id] = stores.get(n.id, 0) + 1
+            if isinstance(n, (ast.Attribute, ast.Subscript)):
+                if isinstance(n.value, ast.Name):
+                    mutated.add(n.value.id)
+        constants = {}
+        for stmt in tree.body:
+            if (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and
+                    isinstance(stmt.targets[0], ast.Name)):
+                name = stmt.targets[0].id
+                if stores[name] == 1 and name not in mutated:
+                    constants[name] = stmt.value
+
+        def fold(n, depth=0):
+            if depth > 32:
+                raise ValueError("Too deep")
+            if isinstance(n, ast.Constant):
+                return n.value
+            if isinstance(n, ast.Name) and n.id in constants:
+                return fold(constants[n.id], depth + 1)
+            if isinstance(n, (ast.List, ast.Tuple, ast.Set)):
+                items = []
+                for x in n.elts:
+                    if isinstance(x, ast.Starred):
+                        items.extend(fold(x.value, depth + 1))
+                    else:
+                        items.append(fold(x, depth + 1))
+                return items
+            if isinstance(n, ast.Dict):
+                items = {}
+                for k, v in zip(n.keys, n.values):
+                    if k is None:
+                        items.update(fold(v, depth + 1))
+                    else:
+                        items[fold(k, depth + 1)] = fold(v, depth + 1)
+                return items
+            if isinstance(n, ast.BinOp) and isinstance(n.op, ast.Add):
+                return fold(n.left, depth + 1) + fold(n.right, depth + 1)
+            raise ValueError(ast.dump(n))
+
+        keywords = {}
+        for k in node.keywords:
+            try:
+                value = fold(k.value)
+            except (TypeError, ValueError):
+                if k.arg is None or k.arg in self.static_attributes:
+                    LOG.debug("Dynamic setup() keyword: %s", k.arg)
+                    return None
+                continue
+            if k.arg is None:
+                if not isinstance(value, dict):
+                    return None
+                keywords.update(value)
+            else:
+                keywords[k.arg] = value
+        return keywords
+
 
 class ModuleSet(dict):
-    """Radix-tree-like structure for modules lookup."""
+    """Flat structure for modules lookup.
 
-    requirement = None
+    Modules (tuples of submodule names) are stored as keys of a single
+    dictionary, and the requirement which provides given module is stored
+    as a value. Module lookup checks module prefixes, starting with the
+    longest one, so the most specific registered module wins.
+
+    """
+
+    __slots__ = ('depth',)
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        # Number of submodules of the longest registered module.
+        self.depth = max(map(len, self), default=0)
 
     def add(self, module, requirement):
-        for mod in module:
-            self = self.setdefault(mod, ModuleSet())
-        self.requirement = requirement
+        self[module] = requirement
+        self.depth = max(self.depth, len(module))
+
+    def walk(self):
+        """Iterate over all (module, requirement) pairs."""
+        return iter(self.items())
 
     def __contains__(self, module):
-        for mod in module:
-            self = self.get(mod)
-            if self is None:
-                return False
-            if self.requirement is not None:
-                return True
-        return False
+        return self.lookup(module) is not None
+
+    @timed
+    def lookup(self, module):
+        """Get requirement which provides given module."""
+        if len(module) > self.depth:
+            module = module[:self.depth]
+        while module:
+            if (requirement := self.get(module)) is not None:
+                return requirement
+            module = module[:-1]
+        return None
 
 
 class Flake8Checker(object):
@@ -315,19 +685,39 @@ class Flake8Checker(object):
     name = "flake8-requirements"
     version = __version__
 
-    # Build-in mapping for known 3rd party modules.
-    known_3rd_parties = {
-        k: v
-        for k, v in KNOWN_3RD_PARTIES.items()
-        for k in project2modules(k)
-    }
+    # Target Python version (None for the running interpreter).
+    target_python = None
 
     # Host-based mapping for 3rd party modules.
     known_host_3rd_parties = {}
 
+    # Look up host site-packages for unknown requirements.
+    lookup_host_site_packages = False
+
+    # Check imports against requirements (I900 errors)
+    error_I900_enabled = True
+
     # Collect and report I901 errors
     error_I901_enabled = False
 
+    # Absolute paths of files checked by flake8, scanned by the I901 check.
+    checked_files = None
+
+    # Directory shared by all processes of the current flake8 run.
+    run_dir = None
+
+    # Print resolution statistics in the flake8 benchmark format.
+    benchmark = False
+
+    # Store resolution statistics in the given JSON file.
+    stats_file = None
+
+    # Client of the requirements resolution daemon.
+    daemon = None
+
+    # Bit masks of used requirements, indexed by the root directory.
+    usage = {}
+
     # User defined project->modules mapping.
     known_modules = {}
 
@@ -337,18 +727,60 @@ class Flake8Checker(object):
     # Max depth to resolve recursive requirements.
     requirements_max_depth = 1
 
+    # Evaluate setup.py in a separate process with given timeout.
+    setup_py_timeout = 0
+
     # Root directory of the project.
     root_dir = ""
 
+    # Discover root directory for every checked file.
+    root_dir_per_file = False
+
+    # Files which mark the project's root directory.
+    root_files = ("pyproject.toml", "requirements.txt", "setup.py")
+
+    # Supported lock files (which allow to tell direct dependencies of the
+    # locked project), in the look up order.
+    lockfiles = ("uv.lock", "Pipfile.lock")
+
+    # Discovered root directories, indexed by the directory path.
+    root_dirs = {}
+
+    # Checker classes bound to projects, indexed by the root directory.
+    projects = {}
+
+    # Persistent cache for resolved requirements.
+    index_cache = None
+
+    # Persistent store of imports extracted from checked files.
+    import_store = None
+
+    # Files used for requirements resolution, indexed by the root directory.
+    resolution_sources = {}
+
+    # Resolved modules index.
+    Index = namedtuple('Index', (
+        'mods_1st_party',
+        'mods_3rd_party',
+        'mods_3rd_party_setup',
+    ))
+
     def __init__(self, tree, filename, lines=None):
         """Initialize requirements checker."""
         self.tree = tree
         self.filename = filename
         self.lines = lines
+        self.project = type(self)
+        if self.root_dir_per_file and filename is not None:
+            self.project = self.get_project(
+                self.discover_file_root_dir(filename))
+            self.root_dir = self.project.root_dir
 
     @classmethod
     def add_options(cls, manager):
         """Register plug-in specific options."""
+        # Not-used requirements are reported only if explicitly selected.
+        manager.extend_default_ignore(["I901"])
         manager.add_option(
             "--known-modules",
             action='store',
@@ -389,10 +821,82 @@ class Flake8Checker(object):
                 "which provide more than one module or the name of the module"
                 " is different than the project name itself."
             ))
+        manager.add_option(
+            "--lookup-host-site-packages",
+            action='store_true',
+            parse_from_config=True,
+            help=(
+                "Look up host's site-packages directory for 3rd party "
+                "projects which are listed as requirements, but are not "
+                "known otherwise. Contrary to the --scan-host-site-packages "
+                "option, only metadata of required projects is read."
+            ))
+        manager.add_option(
+            "--target-python",
+            action='store',
+            parse_from_config=True,
+            help=(
+                "Python version (e.g. 3.8) used to determine the set of the "
+                "standard library modules. Defaults to the version of the "
+                "Python interpreter used for flake8 execution."
+            ))
+        manager.add_option(
+            "--setup-py-timeout",
+            type=float,
+            default=0,
+            parse_from_config=True,
+            help=(
+                "Evaluate setup.py in a separate process, which is killed "
+                "if the evaluation takes more than the given number of "
+                "seconds. By default, setup.py is evaluated in the flake8 "
+                "process without any time limit."
+            ))
+        manager.add_option(
+            "--requirements-cache-dir",
+            action='store',
+            parse_from_config=True,
+            help=(
+                "Store resolved project requirements in the given directory. "
+                "The cache is invalidated whenever any of the files used for "
+                "the requirements resolution changes."
+            ))
+        manager.add_option(
+            "--root-dir-per-file",
+            action='store_true',
+            parse_from_config=True,
+            help=(
+                "Discover project's root directory for every checked file "
+                "instead of using the one discovered from the current "
+                "working directory. Useful for repositories which contain "
+                "more than one project (monorepo)."
+            ))
+        manager.add_option(
+            "--requirements-stats-file",
+            action='store',
+            parse_from_config=True,
+            help=(
+                "Store wall time and call counts of requirements resolution "
+                "phases, and cache statistics, aggregated across all worker "
+                "processes, in the given JSON file. The same statistics are "
+                "printed if flake8 runs with the --benchmark option."
+            ))
+        manager.add_option(
+            "--requirements-daemon-socket",
+            action='store',
+            parse_from_config=True,
+            help=(
+                "Query requirements resolution daemon (see the "
+                "flake8_requirements.daemon module) listening on the given "
+                "Unix socket instead of resolving requirements in the flake8 "
+                "process. If the daemon is not available, requirements are "
+                "resolved in-process. The I901 check is always in-process."
+            ))
 
     @classmethod
     def parse_options(cls, options):
         """Parse plug-in specific options."""
+        # Drop everything resolved with previous options.
+        cls.invalidate()
         if isinstance(options.known_modules, dict):
             # Support for nicer known-modules using flake8-pyproject.
             cls.known_modules = {
@@ -410,62 +914,359 @@ class Flake8Checker(object):
             }
         cls.requirements_file = options.requirements_file
         cls.requirements_max_depth = options.requirements_max_depth
+        cls.setup_py_timeout = options.setup_py_timeout
+        # If only other errors are selected (e.g. flake8 --select=E), there
+        # is no need to resolve requirements at all.
+        cls.error_I900_enabled = not options.select or any(
+            "I900".startswith(x)
+            for x in options.select + (options.extend_select or []))
+        # Not-used requirements can be determined only by scanning all
+        # checked files, so this check has to be enabled explicitly.
+        cls.error_I901_enabled = any(
+            "I901".startswith(x)
+            for x in (options.select or []) + (options.extend_select or []))
+        cls.checked_files = None
+        if cls.error_I901_enabled and options.filenames is not None:
+            cls.checked_files = cls.discover_checked_files(options)
+        cls.usage = {}
+        cls.benchmark = options.benchmark
+        cls.stats_file = options.requirements_stats_file
+        stats_enabled = bool(cls.benchmark or cls.stats_file)
+        # The standalone checker (which does not give checked files) records
+        # usage of requirements by every worker in the run directory.
+        record_usage = cls.error_I901_enabled and cls.checked_files is None
+        if (record_usage or stats_enabled) and cls.run_dir is None:
+            from .rundir import RunDirectory
+            cls.run_dir = RunDirectory()
+            if cls.run_dir.is_owner:
+                if options.format == "default":
+                    atexit.register(cls.report_run, options.output_file)
+                else:
+                    # Statistics are not formatted by the flake8 formatter,
+                    # so do not mix them into reports of other formatters.
+                    atexit.register(cls.report_run, None, sys.stderr)
+        if not stats_enabled:
+            timed.stats = None
+        elif timed.stats is None:
+            cls.enable_stats()
+        cls.target_python = None
+        if options.target_python:
+            cls.target_python = tuple(
+                map(int, options.target_python.split(".")[:2]))
         if options.scan_host_site_packages:
             cls.known_host_3rd_parties = cls.discover_host_3rd_party_modules()
+        cls.lookup_host_site_packages = options.lookup_host_site_packages
+        cls.index_cache = None
+        cls.import_store = None
+        if options.requirements_cache_dir:
+            cls.index_cache = IndexCache(options.requirements_cache_dir)
+            cls.import_store = ImportStore(os.path.join(
+                options.requirements_cache_dir, "imports.sqlite"))
+        cls.root_dir_per_file = options.root_dir_per_file
         cls.root_dir = cls.discover_project_root_dir(os.getcwd())
+        cls.daemon = None
+        if options.requirements_daemon_socket and not cls.error_I901_enabled:
+            from .daemon import DaemonClient
+            from .daemon import get_options_key
+            cls.daemon = DaemonClient.connect(
+                options.requirements_daemon_socket, get_options_key(cls))
+            if cls.daemon is not None:
+                return
+        if not (cls.error_I900_enabled or cls.error_I901_enabled):
+            return
+        # Resolve requirements before flake8 spawns worker processes, so the
+        # resolved index will be shared with workers (copy-on-write after
+        # fork) instead of being resolved by every single worker.
+        root_dirs = [cls.root_dir]
+        if cls.root_dir_per_file and options.filenames is not None:
+            files = cls.checked_files
+            if files is None:
+                files = cls.discover_checked_files(options)
+            root_dirs.extend(map(cls.discover_file_root_dir, files))
+        for root_dir in dict.fromkeys(root_dirs):
+            try:
+                cls.get_project(root_dir).get_index()
+            except Exception as e:
+                # Postpone error reporting until the index is actually used,
+                # so e.g. broken setup.py will not break flake8 options
+                # parsing.
+                LOG.debug("Couldn't resolve requirements: %r", e)
 
     @staticmethod
-    def discover_host_3rd_party_modules():
-        """Scan host site-packages for 3rd party modules."""
+    def discover_checked_files(options):
+        """Discover files which will be checked by flake8."""
+        exclude = [*options.exclude, *options.extend_exclude]
+        try:
+            from flake8.discover_files import expand_paths
+        except ImportError:
+            # The expand_paths() function is available since flake8 5.0.
+            from .cli import find_files
+            files = find_files(options.filenames or ["."], exclude)
+        else:
+            files = expand_paths(
+                paths=options.filenames,
+                stdin_display_name=options.stdin_display_name,
+                filename_patterns=options.filename,
+                exclude=exclude)
+        return sorted(os.path.abspath(x) for x in files if x != "-")
+
+    @staticmethod
+    @memoize
+    def get_known_3rd_parties():
+        """Get built-in mapping between projects and provided modules.
+
+        The mapping (which is quite large) is loaded on the first lookup, so
+        flake8 runs which do not need it do not pay for its import.
+
+        """
+        from .modules import KNOWN_3RD_PARTIES
+        return {
+            k: v
+            for k, v in KNOWN_3RD_PARTIES.items()
+            for k in project2modules(k)
+        }
+
+    @staticmethod
+    @memoize
+    def get_known_3rd_parties_reverse():
+        """Get built-in mapping between modules and providing projects."""
+        from .modules import KNOWN_3RD_PARTIES
         mapping = {}
+        for project, modules in KNOWN_3RD_PARTIES.items():
+            for module in modules:
+                mapping.setdefault(module, []).append(project)
+        return mapping
+
+    @staticmethod
+    def get_site_packages_dirs():
+        """Get list of host site-packages directories."""
+        import site
         try:
             site_packages_dirs = site.getsitepackages()
             site_packages_dirs.append(site.getusersitepackages())
         except AttributeError as e:
             LOG.error("Couldn't get site packages: %s", e)
-            return mapping
-        for site_dir in site_packages_dirs:
+            return []
+        return site_packages_dirs
+
+    @staticmethod
+    @memoize
+    def get_host_dists():
+        """Get list of installed projects metadata directories."""
+        dists = []
+        for site_dir in Flake8Checker.get_site_packages_dirs():
             try:
                 dir_entries = os.listdir(site_dir)
             except IOError:
                 continue
-            for egg in (x for x in dir_entries if x.endswith(".egg-info")):
-                pkg_info_path = os.path.join(site_dir, egg, "PKG-INFO")
-                modules_path = os.path.join(site_dir, egg, "top_level.txt")
-                if not os.path.isfile(pkg_info_path):
+            dists.extend(
+                os.path.join(site_dir, x) for x in sorted(dir_entries)
+                if x.endswith((".dist-info", ".egg-info")))
+        return dists
+
+    @classmethod
+    @timed
+    def discover_host_3rd_party_modules(cls):
+        """Scan host site-packages for 3rd party modules."""
+        from concurrent.futures import ThreadPoolExecutor
+        mapping = {}
+        dists = cls.get_host_dists()
+        # Reading metadata is I/O bound, so use threads to hide latency.
+        with ThreadPoolExecutor() as executor:
+            for name, modules in executor.map(cls.read_host_dist, dists):
+                if not modules:
                     continue
-                with open(pkg_info_path) as f:
-                    name = next(iter(
-                        line.split(":")[1].strip()
-                        for line in filtercomments(f.readlines())
-                        if line.lower().startswith("name:")
-                    ), "")
-                with open(modules_path) as f:
-                    modules = list(filtercomments(f.readlines()))
                 for name in project2modules(name):
                     mapping[name] = modules
         return mapping
 
     @staticmethod
-    def discover_project_root_dir(path):
+    @memoize
+    def get_host_dists_index():
+        """Get mapping between normalized project names and metadata."""
+        index = {}
+        for path in Flake8Checker.get_host_dists():
+            name = os.path.splitext(os.path.basename(path))[0].split("-")[0]
+            # Earlier site-packages directories take precedence.
+            index.setdefault(re.sub(r"[-_.]+", "_", name.lower()), path)
+        return index
+
+    @staticmethod
+    @memoize
+    @timed
+    def lookup_host_3rd_party_modules(project):
+        """Look up host site-packages for modules of the given project."""
+        name = re.sub(r"[-_.]+", "_", project.lower())
+        if path := Flake8Checker.get_host_dists_index().get(name):
+            return Flake8Checker.read_host_dist(path)[1]
+        return []
+
+    @classmethod
+    def read_host_dist(cls, path):
+        """Read project name and top-level modules of installed project."""
+        name = cls.read_host_dist_name(path)
+        try:
+            with open(os.path.join(path, "top_level.txt")) as f:
+                return name, list(filtercomments(f))
+        except IOError:
+            pass
+        # Modern wheels do not ship top_level.txt file, so in such a case
+        # guess top-level modules based on the list of installed files.
+        try:
+            with open(os.path.join(path, "RECORD")) as f:
+                return name, cls.get_record_modules(f)
+        except IOError:
+            return name, []
+
+    @staticmethod
+    def read_host_dist_name(path):
+        """Read project name from metadata of installed project."""
+        metadata = "METADATA" if path.endswith(".dist-info") else "PKG-INFO"
+        try:
+            with open(os.path.join(path, metadata)) as f:
+                # The name is stored in the metadata header, which ends with
+                # the first empty line, so do not read the description.
+                for line in iter(f.readline, "\n"):
+                    if not line:
+                        break
+                    if line.startswith("Name:"):
+                        return line[5:].strip()
+        except (IOError, UnicodeDecodeError):
+            pass
+        # Directory name starts with the project name, however, with all
+        # special characters escaped (e.g. zope_interface-5.0.dist-info).
+        return os.path.splitext(os.path.basename(path))[0].split("-")[0]
+
+    @staticmethod
+    def get_record_modules(lines):
+        """Get top-level modules from the RECORD file of installed wheel."""
+        modules = []
+        for line in lines:
+            path = line.split(",", 1)[0].split("/")
+            top = path[0]
+            if len(path) == 1:
+                # Single file module or extension (e.g. mod.cpython-3x.so).
+                top, ext = os.path.splitext(top)
+                if ext not in (".py", ".so", ".pyd"):
+                    continue
+                top = top.split(".")[0]
+            elif top.endswith((".dist-info", ".data")) or top == "..":
+                continue
+            if top.isidentifier() and top not in modules:
+                if top != "__pycache__":
+                    modules.append(top)
+        return modules
+
+    @classmethod
+    def discover_project_root_dir(cls, path):
         """Discover project's root directory starting from given path."""
-        root_files = ["pyproject.toml", "requirements.txt", "setup.py"]
         while path != os.path.abspath(os.sep):
-            paths = [os.path.join(path, x) for x in root_files]
+            paths = [os.path.join(path, x) for x in cls.root_files]
             if any(map(os.path.exists, paths)):
                 LOG.info("Discovered root directory: %s", path)
                 return path
             path = os.path.abspath(os.path.join(path, ".."))
         return ""
 
-    @staticmethod
-    def is_project_setup_py(project_root_dir, filename):
+    @classmethod
+    def discover_file_root_dir(cls, filename):
+        """Discover root directory of the project containing given file.
+
+        Results are cached for every directory visited during the discovery,
+        so the lookup for any other file in these directories is instant.
+
+        """
+        path = os.path.dirname(os.path.abspath(filename))
+        visited = []
+        root_dir = ""
+        while path not in cls.root_dirs:
+            visited.append(path)
+            if path == os.path.abspath(os.sep):
+                # Fall back to the root directory discovered for the
+                # current working directory.
+                root_dir = cls.root_dir
+                break
+            paths = [os.path.join(path, x) for x in cls.root_files]
+            if any(map(os.path.exists, paths)):
+                LOG.info("Discovered root directory: %s", path)
+                root_dir = path
+                break
+            path = os.path.dirname(path)
+        else:
+            root_dir = cls.root_dirs[path]
+        for path in visited:
+            cls.root_dirs[path] = root_dir
+        return root_dir
+
+    @classmethod
+    def get_project(cls, root_dir):
+        """Get checker class bound to the given project root directory.
+
+        All requirements resolution methods use the root directory stored in
+        the class attribute, so such a bound class (with its own memoized
+        resolved index) shall be used for every project in the monorepo.
+
+        """
+        if root_dir == cls.root_dir:
+            return cls
+        if (project := cls.projects.get(root_dir)) is None:
+            project = cls.projects[root_dir] = type(
+                cls.__name__, (cls,), {'root_dir': root_dir})
+        return project
+
+    @classmethod
+    def invalidate(cls, root_dir=None):
+        """Invalidate cached data of the given project.
+
+        This method shall be used by long-lived processes which embed flake8
+        (e.g. language servers) whenever project's requirements change. If
+        the root directory is not given, the whole cache is cleared.
+
+        """
+        if root_dir is None:
+            memoize.cache.clear()
+            cls.resolution_sources.clear()
+            cls.root_dirs.clear()
+            cls.projects.clear()
+            return
+        memoize.cache.invalidate(root_dir)
+        cls.resolution_sources.pop(root_dir, None)
+        cls.projects.pop(root_dir, None)
+        # Newly created files might change the root directory discovery.
+        for path in [k for k, v in cls.root_dirs.items() if v == root_dir]:
+            del cls.root_dirs[path]
+
+    @classmethod
+    @memoize
+    def get_setup_py_identity(cls):
+        """Get (device, inode) pair identifying project's setup.py file."""
+        try:
+            st = os.stat(os.path.join(cls.root_dir, "setup.py"))
+        except OSError:
+            return None
+        return st.st_dev, st.st_ino
+
+    @classmethod
+    def is_project_setup_py(cls, project_root_dir, filename):
         """Determine whether given file is project's setup.py file."""
-        project_setup_py = os.path.join(project_root_dir, "setup.py")
+        # Do not bother the file system if the file name does not match.
+        if os.path.basename(filename) != "setup.py":
+            return False
+        identity = cls.get_project(project_root_dir).get_setup_py_identity()
+        if identity is None:
+            return False
         try:
-            return os.path.samefile(filename, project_setup_py)
+            st = os.stat(filename)
         except OSError:
             return False
+        return identity == (st.st_dev, st.st_ino)
+
+    @classmethod
+    def add_resolution_source(cls, path):
+        """Record file used for requirements resolution."""
+        # Use dict as an insertion-ordered set.
+        sources = cls.resolution_sources.setdefault(cls.root_dir, {})
+        sources[os.path.abspath(path)] = None
 
     _requirement_match_option = re.compile(
         r"(-[\w-]+)(.*)").match
@@ -486,7 +1287,71 @@ class Flake8Checker(object):
 
     @classmethod
     def resolve_requirement(cls, requirement, max_depth=0, path=None):
-        """Resolves flags like -r in an individual requirement line."""
+        """Resolves flags like -r in an individual requirement line.
+
+        Requirements from constraints files (included with the -c flag) are
+        not returned, since constraints do not add new requirements.
+
+        """
+        return cls.resolve_requirement_entry(
+            cls.parse_requirement(requirement),
+            max_depth, path or cls.root_dir, set())
+
+    @classmethod
+    def resolve_requirement_entry(
+            cls, entry, max_depth, path, visited, is_constraint=False):
+        """Resolve entry created by the parse_requirement() method."""
+        option, requirement = entry
+        if option is None:
+            return [] if requirement is None else [requirement]
+        filename = os.path.join(path, requirement)
+        is_constraint = is_constraint or option == "-c"
+        # Every file is resolved once, even if it is included from several
+        # places. This also prevents infinite include cycles. However, file
+        # included as a constraints file might be included as requirements
+        # file as well, so these cases are tracked separately.
+        if (key := (os.path.abspath(filename), is_constraint)) in visited:
+            return []
+        # Error out if we need to recurse deeper than allowed.
+        if max_depth <= 0:
+            msg = (
+                "Cannot resolve {}: "
+                "Beyond max depth (--requirements-max-depth={})")
+            raise RuntimeError(msg.format(
+                requirement, cls.requirements_max_depth))
+        visited.add(key)
+        cls.add_resolution_source(filename)
+        resolved = []
+        # Error out if requirements file cannot be opened.
+        for entry in cls.read_requirements_file(filename):
+            resolved.extend(cls.resolve_requirement_entry(
+                entry, max_depth - 1, os.path.dirname(filename), visited,
+                is_constraint))
+        return [] if option == "-c" else resolved
+
+    @classmethod
+    @memoize
+    def read_requirements_file(cls, path):
+        """Read and parse requirements text file.
+
+        The file is parsed once, no matter how many times it is included.
+        Included files are not resolved here, they are returned as entries
+        with the "-r" or "-c" option instead.
+
+        """
+        with open(path) as f:
+            return tuple(map(cls.parse_requirement, joinlines(f)))
+
+    @classmethod
+    def parse_requirement(cls, requirement):
+        """Parse individual requirement line.
+
+        This method returns (option, requirement) tuple. The option is "-r"
+        or "-c" for included requirements or constraints file respectively,
+        otherwise it is None. The requirement is None if the line shall be
+        skipped.
+
+        """
 
         option = None
         if match := cls._requirement_match_option(requirement):
@@ -500,39 +1365,27 @@ class Flake8Checker(object):
             option = None
 
         if option in ("-r", "--requirement"):
-            # Error out if we need to recurse deeper than allowed.
-            if max_depth <= 0:
-                msg = (
-                    "Cannot resolve {}: "
-                    "Beyond max depth (--requirements-max-depth={})")
-                raise RuntimeError(msg.format(
-                    requirement, cls.requirements_max_depth))
-            resolved = []
-            # Error out if requirements file cannot be opened.
-            with open(os.path.join(path or cls.root_dir, requirement)) as f:
-                for line in joinlines(f.readlines()):
-                    resolved.extend(cls.resolve_requirement(
-                        line, max_depth - 1, os.path.dirname(f.name)))
-            return resolved
+            return "-r", requirement
+        if option in ("-c", "--constraint"):
+            return "-c", requirement
 
         if option:
             # Skip whole line if option was not processed earlier.
-            return []
+            return None, None
 
         # Check for a requirement given as a VCS link.
         if match := cls._requirement_match_vcs(requirement):
             if match := cls._requirement_match_vcs_spec(match.group(2)):
-                return [match.group(1)]
+                return None, match.group(1)
 
         # Check for a requirement given as a local archive file.
         if match := cls._requirement_match_archive(requirement):
             base = os.path.basename(match.group(1))
             if match := cls._requirement_match_archive_spec(base):
                 name, version = match.groups()
-                return [
+                return None, (
                     name if not version else
-                    "{} == {}".format(name, version[1:])
-                ]
+                    "{} == {}".format(name, version[1:]))
 
         # Editable installation is made either from local path or from VCS
         # URL. In case of VCS, the URL should be already handled in the if
@@ -546,13 +1399,19 @@ class Flake8Checker(object):
         if match := cls._requirement_match_spec(requirement):
             requirement = match.group(1)
 
-        return [requirement.strip()]
+        return None, requirement.strip()
 
     @classmethod
     @memoize
+    @timed
     def get_pyproject_toml(cls):
         """Try to load PEP 518 configuration file."""
+        if sys.version_info >= (3, 11):
+            import tomllib
+        else:
+            import tomli as tomllib
         pyproject_config_path = os.path.join(cls.root_dir, "pyproject.toml")
+        cls.add_resolution_source(pyproject_config_path)
         try:
             with open(pyproject_config_path, mode="rb") as f:
                 return tomllib.load(f)
@@ -586,9 +1445,10 @@ class Flake8Checker(object):
             ).values():
                 files_to_parse.extend(element.get('file', []))
         for file_path in files_to_parse:
+            cls.add_resolution_source(file_path)
             try:
                 with open(file_path, 'r') as file:
-                    requirements.extend(parse_requirements(file.readlines()))
+                    requirements.extend(parse_requirements(file))
             except IOError as e:
                 LOG.debug("Couldn't open requirements file: %s", e)
         return requirements
@@ -628,22 +1488,101 @@ class Flake8Checker(object):
         return requirements
 
     @classmethod
+    @timed
     def get_requirements_txt(cls):
         """Try to load requirements from text file."""
         path = cls.requirements_file or "requirements.txt"
         if not os.path.isabs(path):
             path = os.path.join(cls.root_dir, path)
+        if os.path.basename(path) in cls.lockfiles:
+            return cls.get_lockfile(path)
         try:
             return tuple(parse_requirements(cls.resolve_requirement(
                 "-r {}".format(path), cls.requirements_max_depth + 1)))
         except IOError as e:
-            LOG.error("Couldn't load requirements: %s", e)
+            # Missing requirements.txt is not an error if requirements can
+            # be read from the lock file instead.
+            if cls.requirements_file is None and not os.path.exists(path) \
+                    and any(os.path.exists(os.path.join(cls.root_dir, x))
+                            for x in cls.lockfiles):
+                LOG.debug("Couldn't load requirements: %s", e)
+            else:
+                LOG.error("Couldn't load requirements: %s", e)
             return ()
 
+    @classmethod
+    def get_lockfile_requirements(cls):
+        """Try to load requirements from the lock file."""
+        for name in cls.lockfiles:
+            path = os.path.join(cls.root_dir, name)
+            if os.path.exists(path):
+                return cls.get_lockfile(path)
+            # Record missing files as well, so creating the lock file will
+            # invalidate the persistent cache.
+            cls.add_resolution_source(path)
+        return ()
+
+    @classmethod
+    def get_lockfile(cls, path):
+        """Load direct requirements of the project locked in given file."""
+        cls.add_resolution_source(path)
+        if os.path.basename(path) == "Pipfile.lock":
+            # Pipenv lock file does not mark direct dependencies, so they
+            # are read from the Pipfile instead.
+            path = path[:-len(".lock")]
+            cls.add_resolution_source(path)
+        return cls.read_lockfile(path)
+
+    @classmethod
+    @memoize
+    @timed
+    def read_lockfile(cls, path):
+        """Read direct requirements of the locked project.
+
+        The uv lock file lists all locked packages, however, only the locked
+        project itself (or all workspace members) has dependencies of its
+        own, which are direct requirements. The Pipfile lists direct
+        requirements in the default and development groups. Only project
+        names are returned, so the packaging library is not needed.
+
+        """
+        if sys.version_info >= (3, 11):
+            import tomllib
+        else:
+            import tomli as tomllib
+        try:
+            with open(path, mode="rb") as f:
+                data = tomllib.load(f)
+            if os.path.basename(path) == "Pipfile":
+                requires = [
+                    *data.get('packages', {}),
+                    *data.get('dev-packages', {})]
+            else:
+                members = [
+                    package for package in data.get('package', [])
+                    if {'editable', 'virtual'} & set(
+                        package.get('source', {}))]
+                names = {package['name'] for package in members}
+                requires = []
+                for package in members:
+                    dependencies = list(package.get('dependencies', []))
+                    for group in ('optional-dependencies', 'dev-dependencies'):
+                        for x in package.get(group, {}).values():
+                            dependencies.extend(x)
+                    requires.extend(
+                        x['name'] for x in dependencies
+                        if x['name'] not in names)
+        except (IOError, KeyError, TypeError, ValueError) as e:
+            LOG.error("Couldn't load lock file: %s", e)
+            return ()
+        return tuple(parse_requirements(dict.fromkeys(requires)))
+
     @classmethod
     @memoize
+    @timed
     def get_setup_cfg(cls):
         """Try to load standard configuration file."""
+        from configparser import ConfigParser
         config = ConfigParser()
         config.read_dict({
             'metadata': {'name': ""},
@@ -653,7 +1592,9 @@ class Flake8Checker(object):
                 'tests_require': ""},
             'options.extras_require': {},
         })
-        if not config.read(os.path.join(cls.root_dir, "setup.cfg")):
+        setup_cfg_path = os.path.join(cls.root_dir, "setup.cfg")
+        cls.add_resolution_source(setup_cfg_path)
+        if not config.read(setup_cfg_path):
             LOG.debug("Couldn't load setup configuration: setup.cfg")
         return config
 
@@ -676,14 +1617,47 @@ class Flake8Checker(object):
 
     @classmethod
     @memoize
+    @timed
     def get_setup_py(cls):
         """Try to load standard setup file."""
+        setup_py_path = os.path.join(cls.root_dir, "setup.py")
+        cls.add_resolution_source(setup_py_path)
         try:
-            with open(os.path.join(cls.root_dir, "setup.py")) as f:
-                return SetupVisitor(ast.parse(f.read()), cls.root_dir)
+            with open(setup_py_path) as f:
+                source = f.read()
         except IOError as e:
             LOG.debug("Couldn't load setup: %s", e)
             return SetupVisitor(ast.parse(""), cls.root_dir)
+        if cls.setup_py_timeout:
+            return cls.get_setup_py_isolated(source)
+        return SetupVisitor(ast.parse(source), cls.root_dir)
+
+    @classmethod
+    def get_setup_py_isolated(cls, source):
+        """Evaluate setup.py in a separate process.
+
+        If the persistent cache is enabled, evaluation results are cached by
+        the setup.py content hash, and are valid as long as none of the files
+        opened during the evaluation has changed.
+
+        """
+        import hashlib
+        digest = hashlib.sha256(source.encode()).hexdigest()
+        name = "setup.py:{}:{}".format(os.path.abspath(cls.root_dir), digest)
+        result = None
+        if cls.index_cache is not None:
+            result = cls.index_cache.load(name, __version__)
+        if result is None:
+            result = SetupVisitor.evaluate_isolated(
+                source, cls.root_dir, cls.setup_py_timeout)
+            if result is None:
+                return SetupVisitor.from_keywords(None)
+            if cls.index_cache is not None:
+                cls.index_cache.store(
+                    name, __version__, result, result['files'])
+        for path in result['files']:
+            cls.add_resolution_source(path)
+        return SetupVisitor.from_keywords(result['keywords'])
 
     @classmethod
     def get_setup_py_requirements(cls, is_setup_py):
@@ -726,10 +1700,18 @@ class Flake8Checker(object):
             # Use known module mappings to correct auto-detected module name.
             if modules[0] in cls.known_modules:
                 modules = cls.known_modules[modules[0]]
-            elif modules[0] in cls.known_3rd_parties:
-                modules = cls.known_3rd_parties[modules[0]]
+            elif modules[0] in cls.get_known_3rd_parties():
+                modules = cls.get_known_3rd_parties()[modules[0]]
             elif modules[0] in cls.known_host_3rd_parties:
                 modules = cls.known_host_3rd_parties[modules[0]]
+            elif cls.lookup_host_site_packages:
+                # Installing or removing projects modifies site-packages
+                # directories, so track them for the persistent cache.
+                for path in cls.get_site_packages_dirs():
+                    cls.add_resolution_source(path)
+                modules = (
+                    cls.lookup_host_3rd_party_modules(requirement.name) or
+                    modules)
             for module in modules:
                 mods_3rd_party.add(modsplit(module), requirement)
         return mods_3rd_party
@@ -750,43 +1732,492 @@ class Flake8Checker(object):
             # Check project configuration for requirements.
             cls.get_pyproject_toml_poetry_requirements() or
             # Fall-back to requirements.txt in our root directory.
-            cls.get_requirements_txt()
+            cls.get_requirements_txt() or
+            # Fall-back to the lock file, which lists indirect requirements
+            # as well, so it is used only if nothing else is available.
+            cls.get_lockfile_requirements()
+        )
+
+    @classmethod
+    def get_index_key(cls):
+        """Get digest of options which affect requirements resolution."""
+        import hashlib
+        import json
+        options = json.dumps([
+            __version__,
+            sys.version_info[:2],
+            cls.known_modules,
+            cls.known_host_3rd_parties,
+            cls.lookup_host_site_packages,
+            cls.requirements_file,
+            cls.requirements_max_depth,
+            cls.setup_py_timeout > 0,
+        ], sort_keys=True)
+        return hashlib.sha256(options.encode()).hexdigest()
+
+    @classmethod
+    @memoize
+    @timed
+    def get_index(cls):
+        """Get resolved modules index.
+
+        If the persistent cache is enabled, the index is loaded from the
+        cache, unless any of the files used for its resolution has changed.
+        Files opened by setup.py evaluated in this process are not known,
+        so such an index is not stored in the cache.
+
+        """
+        if cls.index_cache is not None:
+            data = cls.index_cache.load(
+                os.path.abspath(cls.root_dir), cls.get_index_key())
+            if data is not None:
+                LOG.debug("Loaded cached index: %s", cls.root_dir)
+                cls.resolution_sources[cls.root_dir] = dict.fromkeys(
+                    data['sources'])
+                return cls.Index(*(
+                    cls.load_mods(x, first_party=i == 0)
+                    for i, x in enumerate(data['mods'])
+                ))
+        cls.resolution_sources.pop(cls.root_dir, None)
+        index = cls.Index(
+            cls.get_mods_1st_party(),
+            cls.get_mods_3rd_party(False),
+            cls.get_mods_3rd_party(True),
         )
+        if cls.index_cache is not None and not cls.get_setup_py().evaluated:
+            sources = list(cls.resolution_sources.get(cls.root_dir, ()))
+            cls.index_cache.store(
+                os.path.abspath(cls.root_dir),
+                cls.get_index_key(),
+                {
+                    'mods': [cls.dump_mods(x) for x in index],
+                    'sources': sources,
+                },
+                sources)
+        return index
+
+    @classmethod
+    @memoize
+    def get_index_fingerprint(cls):
+        """Get digest of the resolved index and the standard library.
+
+        Results of the I900 check depend on the imported module and this
+        fingerprint only, so results stored with the same fingerprint can
+        be reused as long as the checked file does not change.
+
+        """
+        import hashlib
+        import json
+        data = json.dumps([
+            cls.get_index_key(),
+            sorted(get_stdlib_modules(cls.target_python)),
+            [cls.dump_mods(x) for x in cls.get_index()],
+        ])
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    @staticmethod
+    def dump_mods(mods):
+        """Convert modules set into JSON-serializable list."""
+        return [
+            [".".join(module), str(requirement)]
+            for module, requirement in mods.walk()
+        ]
+
+    @staticmethod
+    def load_mods(data, first_party=False):
+        """Convert list created by dump_mods() into modules set."""
+        mods = ModuleSet()
+        for module, requirement in data:
+            mods.add(
+                modsplit(module),
+                True if first_party else load_requirement(requirement))
+        return mods
 
     def check_I900(self, node):
         """Run missing requirement checker."""
-        if node.module[0] in STDLIB:
+        if node.module[0] in get_stdlib_modules(self.target_python):
             return None
-        is_setup_py = self.is_project_setup_py(self.root_dir, self.filename)
-        if node.module in self.get_mods_3rd_party(is_setup_py):
+        index = self.project.get_index()
+        if self.is_setup_py:
+            if node.module in index.mods_3rd_party_setup:
+                return None
+        elif node.module in index.mods_3rd_party:
             return None
-        if node.module in self.get_mods_1st_party():
+        if node.module in index.mods_1st_party:
             return None
         # When processing setup.py file, forcefully add setuptools to the
         # project requirements. Setuptools might be required to build the
         # project, even though it is not listed as a requirement - this
         # package is required to run setup.py, so listing it as a setup
         # requirement would be pointless.
-        if (is_setup_py and
-                node.module[0] in KNOWN_3RD_PARTIES["setuptools"]):
+        if self.is_setup_py and "setuptools" in (
+                self.get_known_3rd_parties_reverse().get(node.module[0], ())):
             return None
         return ERRORS['I900'].format(pkg=node.module[0])
 
     def check_I901(self, node):
-        """Run not-used requirement checker."""
-        if node.module[0] in STDLIB:
+        """Run not-used requirement checker of the standalone checker.
+
+        Whether a requirement is used or not can be determined only after
+        all files have been checked, so here we only record requirements
+        used by the given import statement. Errors are collected by the
+        collect_unused_requirements() method.
+
+        """
+        if node.module[0] in get_stdlib_modules(self.target_python):
             return None
-        # TODO: Implement this check.
+        index = self.project.get_index()
+        mods = index.mods_3rd_party
+        if self.is_setup_py:
+            mods = index.mods_3rd_party_setup
+        if (requirement := mods.lookup(node.module)) is not None:
+            self.project.record_usage(requirement.name)
         return None
 
+    @classmethod
+    @memoize
+    def get_requirements_bits(cls):
+        """Get mapping between canonical requirement names and bit masks.
+
+        Bits are assigned in the sorted names order, so all processes using
+        the same index assign the same bits to the same requirements.
+
+        """
+        names = sorted({
+            canonicalize(requirement.name)
+            for _, requirement in cls.get_index().mods_3rd_party.walk()
+        })
+        return {name: 1 << i for i, name in enumerate(names)}
+
+    @classmethod
+    def record_usage(cls, name=None):
+        """Record used requirement in the run directory.
+
+        Usage is stored in a compact form (bit mask of used requirements),
+        and it is written only if the mask of the current process changes.
+
+        """
+        mask = cls.usage.get(cls.root_dir)
+        bits = mask or 0
+        if name is not None:
+            bits |= cls.get_requirements_bits().get(canonicalize(name), 0)
+        if bits != mask:
+            cls.usage[cls.root_dir] = bits
+            cls.run_dir.append("usage", [cls.root_dir, bits])
+
+    @classmethod
+    def find_requirement(cls, name):
+        """Find the location of the given requirement in source files."""
+        pattern = re.compile(r"(?<![\w.-]){}(?![\w.-])".format(
+            r"[-_.]+".join(map(re.escape, canonicalize(name).split("-")))),
+            re.IGNORECASE)
+        sources = list(cls.resolution_sources.get(cls.root_dir, ()))
+        for path in sources:
+            try:
+                with open(path) as f:
+                    for row, line in enumerate(f, 1):
+                        if match := pattern.search(line.split("#")[0]):
+                            return path, row, match.start() + 1
+            except (IOError, UnicodeDecodeError):
+                continue
+        return (sources or [os.path.join(cls.root_dir, "setup.py")])[0], 1, 1
+
+    @classmethod
+    def get_unused_requirements(cls):
+        """Get errors for requirements not used by any checked file."""
+        usage = {}
+        for root_dir, bits in cls.run_dir.read("usage"):
+            usage[root_dir] = usage.get(root_dir, 0) | bits
+        errors = []
+        for root_dir, bits in sorted(usage.items()):
+            project = cls.get_project(root_dir)
+            for name, bit in project.get_requirements_bits().items():
+                if not bits & bit:
+                    errors.append(project.find_requirement(name) + (
+                        ERRORS['I901'].format(pkg=name),))
+        return sorted(errors)
+
+    @classmethod
+    def collect_unused_requirements(cls):
+        """Get I901 errors recorded by all processes of the run."""
+        if cls.run_dir is None or not cls.run_dir.is_owner:
+            return []
+        return cls.get_unused_requirements()
+
+    @classmethod
+    @memoize
+    def get_checked_files(cls):
+        """Get files of the project which are checked by flake8."""
+        if not cls.root_dir_per_file:
+            return cls.checked_files
+        return [
+            x for x in cls.checked_files
+            if cls.discover_file_root_dir(x) == cls.root_dir]
+
+    @classmethod
+    @memoize
+    def get_usage_anchor(cls):
+        """Get checked file against which I901 errors are reported.
+
+        Flake8 does not check requirements files, so I901 errors of the
+        project are reported against its setup.py file, or against the first
+        checked file of the project if setup.py is not checked.
+
+        """
+        files = cls.get_checked_files()
+        setup_py = os.path.join(os.path.abspath(cls.root_dir), "setup.py")
+        if setup_py in files:
+            return setup_py
+        return files[0] if files else None
+
+    def check_unused_requirements(self, imports):
+        """Get I901 errors of requirements not used by any checked file.
+
+        Imports of other checked files are taken from the import store if
+        the persistent cache is enabled, otherwise these files are parsed.
+
+        """
+        project = self.project
+        index = project.get_index()
+        filename = os.path.abspath(self.filename)
+        used = set()
+        for path in project.get_checked_files():
+            nodes = imports
+            if path != filename:
+                try:
+                    with open(path, "rb") as f:
+                        source = f.read()
+                    nodes = self.get_imports(source, path)
+                except (OSError, SyntaxError, ValueError):
+                    continue
+            mods = index.mods_3rd_party
+            if project.is_project_setup_py(project.root_dir, path):
+                mods = index.mods_3rd_party_setup
+            for node in nodes:
+                if (requirement := mods.lookup(node.module)) is not None:
+                    used.add(canonicalize(requirement.name))
+        for name in sorted(project.get_requirements_bits()):
+            if name in used:
+                continue
+            path, row, col = project.find_requirement(name)
+            error = ERRORS['I901'].format(pkg=name)
+            if path != filename:
+                # Point to the requirement, which is listed in other file.
+                error += " ({}:{})".format(
+                    os.path.relpath(path, project.root_dir), row)
+                row, col = 1, 1
+            yield row, col - 1, error, type(self)
+
+    @classmethod
+    def enable_stats(cls):
+        """Start collecting resolution statistics.
+
+        Forked worker processes inherit statistics of the main process, so
+        they start with empty statistics instead. All worker processes store
+        their statistics in the run directory at exit.
+
+        """
+        from multiprocessing import util
+
+        from .stats import Stats
+        timed.stats = Stats()
+        util.register_after_fork(timed.stats, cls.reset_stats)
+        if not cls.run_dir.is_owner:
+            # Worker process started with the spawn method.
+            util.Finalize(None, cls.store_stats, exitpriority=0)
+
+    @classmethod
+    def reset_stats(cls, stats):
+        """Reset statistics inherited by the forked worker process."""
+        from multiprocessing import util
+        stats.clear()
+        memoize.cache.hits = memoize.cache.misses = 0
+        if cls.index_cache is not None:
+            cls.index_cache.hits = cls.index_cache.misses = 0
+        util.Finalize(None, cls.store_stats, exitpriority=0)
+
+    @classmethod
+    def get_stats(cls):
+        """Get statistics of the current process."""
+        data = timed.stats.dump()
+        counters = data['counters']
+        counters['processes'] = 1
+        counters['memoize hits'] = memoize.cache.hits
+        counters['memoize misses'] = memoize.cache.misses
+        if cls.index_cache is not None:
+            counters['index cache hits'] = cls.index_cache.hits
+            counters['index cache misses'] = cls.index_cache.misses
+        return data
+
+    @classmethod
+    def store_stats(cls):
+        """Store statistics of the worker process in the run directory."""
+        if timed.stats is not None and cls.run_dir is not None:
+            cls.run_dir.append("stats", cls.get_stats())
+
+    @classmethod
+    def collect_stats(cls):
+        """Get statistics merged from all processes of the run."""
+        from .stats import Stats
+        stats = Stats()
+        stats.merge(cls.get_stats())
+        for data in cls.run_dir.read("stats"):
+            stats.merge(data)
+        return stats
+
+    @classmethod
+    def report_stats(cls, stream=None):
+        """Report resolution statistics after all files have been checked.
+
+        Statistics are stored in the JSON file given with the
+        --requirements-stats-file option, and are written to the given
+        stream (standard output by default) if the --benchmark option is set.
+
+        """
+        if timed.stats is None or cls.run_dir is None:
+            return
+        if not cls.run_dir.is_owner:
+            return
+        stats = cls.collect_stats()
+        if cls.stats_file:
+            import json
+            try:
+                with open(cls.stats_file, "w") as f:
+                    json.dump(stats.dump(), f, indent=2)
+            except IOError as e:
+                LOG.error("Couldn't store statistics: %s", e)
+        if cls.benchmark:
+            stream = stream or sys.stdout
+            stream.write(stats.format_benchmarks())
+            stream.flush()
+
+    @classmethod
+    def finish_run(cls):
+        """Remove the run directory created by the current process."""
+        if cls.run_dir is None or not cls.run_dir.is_owner:
+            return
+        cls.run_dir.cleanup()
+        cls.run_dir = None
+
+    @classmethod
+    def report_run(cls, output_file=None, stream=None):
+        """Report results collected by all processes at flake8 exit.
+
+        Results are appended to the output file if it is given, otherwise,
+        they are written to the given stream (standard output by default).
+
+        """
+        try:
+            if cls.benchmark and output_file:
+                with open(output_file, "a") as f:
+                    cls.report_stats(f)
+            else:
+                cls.report_stats(stream)
+        finally:
+            cls.finish_run()
+
+    @timed
+    def query_daemon(self, verdicts, imports):
+        """Get check results of not yet checked modules from the daemon.
+
+        If the daemon fails, it is not used anymore by the current process,
+        and requirements are resolved in-process instead.
+
+        """
+        modules = list(dict.fromkeys(
+            x.module for x in imports if x.module not in verdicts))
+        if not modules:
+            return
+        try:
+            errors = self.daemon.query(
+                self.root_dir, self.is_setup_py, modules)
+        except (OSError, ValueError) as e:
+            LOG.warning("Couldn't query resolution daemon: %s", e)
+            Flake8Checker.daemon = None
+            return
+        for module, error in zip(modules, errors):
+            verdicts[module] = (error,) if error else ()
+
+    @classmethod
+    @memoize
+    def get_verdicts(cls, is_setup_py):
+        """Get cache of check results, indexed by the imported module.
+
+        Results depend on the imported module and the resolved index only,
+        so they are shared by all files of the project checked by the current
+        process, and are invalidated together with the resolved index. Note,
+        that the I901 check records usage once per process anyway, so it is
+        safe to skip it for already checked modules.
+
+        """
+        return {}
+
+    @classmethod
+    @timed
+    def get_imports(cls, source, filename):
+        """Get import statements of the given source code (bytes).
+
+        If the persistent cache is enabled, imports are stored by the source
+        code hash, so files which have not changed are not parsed again. If
+        the source code cannot be parsed, SyntaxError or ValueError is raised.
+
+        """
+        key = None
+        if cls.import_store is not None:
+            version = "{}:{}.{}".format(__version__, *sys.version_info[:2])
+            key = cls.import_store.get_key(source, version)
+            if (imports := cls.import_store.load(key)) is not None:
+                return [
+                    ImportVisitor.Import(line, offset, modsplit(module))
+                    for line, offset, module in imports]
+        imports = ImportVisitor(ast.parse(source, filename)).imports
+        if key is not None:
+            cls.import_store.store(key, [
+                [x.line, x.offset, ".".join(x.module)] for x in imports])
+        return imports
+
     def run(self):
         """Run checker."""
+        return self.check_imports(ImportVisitor(self.tree).imports)
+
+    def check_imports(self, imports):
+        """Check import statements extracted by the ImportVisitor."""
+
+        if not (self.error_I900_enabled or self.error_I901_enabled):
+            return
+
+        # Determine the file type once, not for every import statement.
+        self.is_setup_py = self.is_project_setup_py(
+            self.root_dir, self.filename)
 
         checkers = []
-        checkers.append(self.check_I900)
-        if self.error_I901_enabled:
+        if self.error_I900_enabled:
+            checkers.append(self.check_I900)
+        if self.error_I901_enabled and self.checked_files is None:
             checkers.append(self.check_I901)
-
-        for node in ImportVisitor(self.tree).imports:
-            for err in filter(None, map(lambda c: c(node), checkers)):
+            # Mark project as checked, even if it does not import anything.
+            self.project.record_usage()
+
+        verdicts = self.project.get_verdicts(self.is_setup_py)
+        verdicts_size = len(verdicts)
+        if self.daemon is not None:
+            self.query_daemon(verdicts, imports)
+        for node in imports:
+            # Check every module once, but report errors at every import.
+            if (errors := verdicts.get(node.module)) is None:
+                errors = verdicts[node.module] = tuple(
+                    filter(None, map(lambda c: c(node), checkers)))
+            for err in errors:
                 yield node.line, node.offset, err, type(self)
+
+        if (stats := timed.stats) is not None:
+            # Every verdict cache miss adds new entry to the cache.
+            misses = len(verdicts) - verdicts_size
+            stats.count("imports", len(imports))
+            stats.count("verdict cache hits", len(imports) - misses)
+            stats.count("verdict cache misses", misses)
+
+        if self.error_I901_enabled and self.checked_files is not None:
+            if os.path.abspath(self.filename) == (
+                    self.project.get_usage_anchor()):
+                yield from self.check_unused_requirements(imports)
@@ -0,0 +1,405 @@
+"""Standalone requirements checker.
+
+This module allows to run requirements checks without the flake8 overhead
+(loading flake8 itself, its option machinery and all other plug-ins), which
+might be useful for CI gates interested in I900/I901 errors only:
+
+    python -m flake8_requirements [options] [path ...]
+
+"""
+import argparse
+import fnmatch
+import functools
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from configparser import ConfigParser
+from itertools import chain
+
+from .checker import Flake8Checker
+from .checker import ImportVisitor
+from .checker import __version__
+from .checker import modsplit
+
+# Directories excluded by default (the same as in flake8).
+EXCLUDE = ".svn,CVS,.bzr,.hg,.git,__pycache__,.tox,.nox,.eggs,*.egg"
+
+# Configuration files which might contain the [flake8] section.
+CONFIG_FILES = ("setup.cfg", "tox.ini", ".flake8")
+
+# Rules description used in the SARIF report.
+RULES = {
+    'I900': "Package is missing in requirements.",
+    'I901': "Package is required but not used.",
+}
+
+# Format version of the incremental mode manifest.
+MANIFEST_VERSION = 1
+
+SARIF_SCHEMA = (
+    "https://docs.oasis-open.org/sarif/sarif/v2.1.0/errata01/os/schemas/"
+    "sarif-schema-2.1.0.json")
+
+
+class OptionManager(object):
+    """Minimal flake8 option manager interface on top of argparse."""
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.config_actions = {}
+
+    def add_option(self, *args, parse_from_config=False, **kw):
+        action = self.parser.add_argument(*args, **kw)
+        if parse_from_config:
+            self.config_actions[action.dest] = action
+
+    def extend_default_ignore(self, codes):
+        # Errors are selected with the --select option only.
+        pass
+
+    def load_config(self, path):
+        """Load plug-in options from the flake8 configuration file."""
+        for name in CONFIG_FILES:
+            config = ConfigParser(interpolation=None)
+            config.read(os.path.join(path, name))
+            if config.has_section("flake8"):
+                break
+        else:
+            return
+        defaults = {}
+        for key, value in config.items("flake8"):
+            action = self.config_actions.get(key.replace("-", "_"))
+            if action is None:
+                continue
+            if action.nargs == 0:
+                # Options with the store_true action.
+                value = config.getboolean("flake8", key)
+            elif action.type is not None:
+                value = action.type(value)
+            defaults[action.dest] = value
+        self.parser.set_defaults(**defaults)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m flake8_requirements",
+        description="Check Python files for missing and not used package "
+        "requirements.")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=["."],
+        help="Files and directories to check (default: current directory).")
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (default: number of CPUs).")
+    parser.add_argument(
+        "--exclude",
+        default=EXCLUDE,
+        help="Comma-separated list of excluded files and directories "
+        "(default: %(default)s).")
+    parser.add_argument(
+        "--select",
+        default="I900",
+        help="Comma-separated list of reported errors (default: "
+        "%(default)s). Use I900,I901 to report not used requirements.")
+    parser.add_argument(
+        "--format",
+        choices=("text", "json", "sarif"),
+        default="text",
+        help="Output format (default: %(default)s).")
+    parser.add_argument(
+        "--output-file",
+        help="Write report to the given file instead of standard output.")
+    parser.add_argument(
+        "--incremental",
+        metavar="MANIFEST",
+        help="Re-check only files changed since the run which stored the "
+        "given manifest file. All files are re-checked if the resolved "
+        "requirements have changed.")
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Print requirements resolution statistics to standard error.")
+    parser.add_argument(
+        "--version",
+        action="version",
+        version="%(prog)s {}".format(__version__))
+    return parser
+
+
+def find_files(paths, exclude):
+    """Find Python files in given paths."""
+
+    def excluded(path):
+        name = os.path.basename(path)
+        return any(
+            fnmatch.fnmatch(name, x) or fnmatch.fnmatch(path, x)
+            for x in exclude)
+
+    for path in paths:
+        if not os.path.isdir(path):
+            # Explicitly given files are checked regardless of extension.
+            if not excluded(path):
+                yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(
+                x for x in dirs if not excluded(os.path.join(root, x)))
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                if name.endswith(".py") and not excluded(path):
+                    yield path
+
+
+def check_file(filename, incremental=False):
+    """Check single file.
+
+    This function returns the file name, the list of (row, col, message)
+    tuples, an error description if the file could not be parsed, and the
+    manifest entry of the file if the incremental mode is enabled.
+
+    """
+    try:
+        with open(filename, "rb") as f:
+            source = f.read()
+        imports = Flake8Checker.get_imports(source, filename)
+    except (OSError, SyntaxError, ValueError) as e:
+        return filename, [], str(e), None
+    checker = Flake8Checker(None, filename)
+    errors = [
+        (row, col + 1, msg)
+        for row, col, msg, _ in checker.check_imports(imports)]
+    entry = None
+    if incremental:
+        entry = {
+            'hash': hashlib.sha256(source).hexdigest(),
+            'index': checker.project.get_index_fingerprint(),
+            'errors': errors,
+            'imports': [[x.line, x.offset, ".".join(x.module)]
+                        for x in imports],
+        }
+    return filename, errors, None, entry
+
+
+def check_files(files, options):
+    """Check given files using a pool of worker processes."""
+    func = check_file
+    if options.incremental:
+        func = functools.partial(check_file, incremental=True)
+    jobs = min(options.jobs, len(files))
+    if jobs <= 1:
+        yield from map(func, files)
+        return
+    initializer, initargs = None, ()
+    if multiprocessing.get_start_method() != "fork":
+        # Without fork, workers do not inherit resolved requirements, so
+        # every worker has to parse options (and resolve index) on its own.
+        initializer, initargs = Flake8Checker.parse_options, (options,)
+    # Use chunks small enough to balance the load between workers.
+    chunksize = max(1, min(64, len(files) // (jobs * 4)))
+    with multiprocessing.Pool(jobs, initializer, initargs) as pool:
+        yield from pool.imap_unordered(func, files, chunksize)
+        # Let workers exit gracefully, so they can store run statistics.
+        pool.close()
+        pool.join()
+
+
+def load_manifest(path):
+    """Load entries of the incremental mode manifest, indexed by path."""
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (IOError, ValueError):
+        return {}
+    if manifest.get('version') != [__version__, MANIFEST_VERSION]:
+        return {}
+    return manifest.get('files', {})
+
+
+def store_manifest(path, entries):
+    """Store entries of the incremental mode manifest."""
+    data = {'version': [__version__, MANIFEST_VERSION], 'files': entries}
+    try:
+        # Write to a temporary file and move it in place, so concurrent runs
+        # will never see partially written manifest.
+        fd, tmp = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    except OSError as e:
+        sys.stderr.write("Couldn't store manifest: {}\n".format(e))
+        return
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        sys.stderr.write("Couldn't store manifest: {}\n".format(e))
+        os.unlink(tmp)
+
+
+def is_unchanged(filename, entry):
+    """Check whether file and its project requirements have not changed."""
+    project = Flake8Checker
+    if Flake8Checker.root_dir_per_file:
+        project = Flake8Checker.get_project(
+            Flake8Checker.discover_file_root_dir(filename))
+    try:
+        with open(filename, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        return (
+            digest == entry['hash'] and
+            entry['index'] == project.get_index_fingerprint())
+    except (OSError, RuntimeError):
+        return False
+
+
+def replay_file(filename, entry):
+    """Check imports stored in the manifest entry of an unchanged file.
+
+    Errors of unchanged files are taken from the manifest, however, stored
+    imports have to be checked again, so requirements used by these files
+    will not be reported as not used.
+
+    """
+    checker = Flake8Checker(None, filename)
+    imports = [
+        ImportVisitor.Import(line, offset, modsplit(module))
+        for line, offset, module in entry['imports']]
+    for _ in checker.check_imports(imports):
+        pass
+
+
+def format_text(errors):
+    return "".join("{}:{}:{}: {}\n".format(*x) for x in errors)
+
+
+def format_json(errors):
+    return json.dumps([
+        {
+            'filename': filename,
+            'line': row,
+            'column': col,
+            'code': msg.split()[0],
+            'text': msg.split(None, 1)[1],
+        }
+        for filename, row, col, msg in errors
+    ], indent=2) + "\n"
+
+
+def format_sarif(errors):
+
+    def uri(path):
+        try:
+            path = os.path.relpath(path)
+        except ValueError:
+            # Path on a different drive (Windows only).
+            pass
+        return path.replace(os.sep, "/")
+
+    return json.dumps({
+        '$schema': SARIF_SCHEMA,
+        'version': "2.1.0",
+        'runs': [{
+            'tool': {
+                'driver': {
+                    'name': Flake8Checker.name,
+                    'version': __version__,
+                    'informationUri': (
+                        "https://github.com/arkq/flake8-requirements"),
+                    'rules': [
+                        {'id': k, 'shortDescription': {'text': v}}
+                        for k, v in sorted(RULES.items())
+                    ],
+                },
+            },
+            'results': [
+                {
+                    'ruleId': msg.split()[0],
+                    'level': "error",
+                    'message': {'text': msg.split(None, 1)[1]},
+                    'locations': [{
+                        'physicalLocation': {
+                            'artifactLocation': {'uri': uri(filename)},
+                            'region': {'startLine': row, 'startColumn': col},
+                        },
+                    }],
+                }
+                for filename, row, col, msg in errors
+            ],
+        }],
+    }, indent=2) + "\n"
+
+
+FORMATTERS = {
+    'text': format_text,
+    'json': format_json,
+    'sarif': format_sarif,
+}
+
+
+def main(argv=None):
+    parser = get_parser()
+    manager = OptionManager(parser)
+    Flake8Checker.add_options(manager)
+    manager.load_config(os.getcwd())
+    options = parser.parse_args(argv)
+
+    # Options used by the plug-in to enable I901 check.
+    select = tuple(x.strip() for x in options.select.split(",") if x.strip())
+    options.select = list(select)
+    options.extend_select = []
+    # Usage of requirements is collected from checked files by workers.
+    options.filenames = None
+    exclude = [x.strip() for x in options.exclude.split(",") if x.strip()]
+
+    # Resolve requirements once, before spawning worker processes.
+    Flake8Checker.parse_options(options)
+
+    errors = []
+    files = list(find_files(options.paths, exclude))
+    results = []
+    manifest = {}
+    if options.incremental:
+        manifest = load_manifest(options.incremental)
+        changed = []
+        for filename in files:
+            entry = manifest.pop(os.path.abspath(filename), None)
+            if entry is not None and is_unchanged(filename, entry):
+                results.append((filename, entry['errors'], None, entry))
+                if Flake8Checker.error_I901_enabled:
+                    replay_file(filename, entry)
+            else:
+                changed.append(filename)
+        files = changed
+        # Keep entries of files which were not checked in this run.
+        manifest = {k: v for k, v in manifest.items() if os.path.exists(k)}
+
+    for filename, file_errors, failure, entry in chain(
+            results, check_files(files, options)):
+        if failure is not None:
+            sys.stderr.write("{}: {}\n".format(filename, failure))
+        if entry is not None:
+            manifest[os.path.abspath(filename)] = entry
+        errors.extend(
+            (filename,) + tuple(x) for x in file_errors
+            if x[2].startswith(select))
+    errors.sort()
+    if options.incremental:
+        store_manifest(options.incremental, manifest)
+    errors.extend(Flake8Checker.collect_unused_requirements())
+
+    report = FORMATTERS[options.format](errors)
+    if options.output_file:
+        with open(options.output_file, "w") as f:
+            f.write(report)
+    else:
+        sys.stdout.write(report)
+    # Do not mix statistics with (possibly machine-readable) report.
+    Flake8Checker.report_stats(sys.stderr)
+    Flake8Checker.finish_run()
+    return 1 if errors else 0
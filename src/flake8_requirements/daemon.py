@@ -0,0 +1,237 @@
+"""Requirements resolution daemon.
+
+Editors and language servers run flake8 on every save, so every run pays
+for the requirements resolution (including setup.py evaluation and host
+site-packages scanning). This daemon keeps resolved indexes of checked
+projects in memory and answers I900 queries over a local Unix socket:
+
+    python -m flake8_requirements.daemon [options] socket
+
+The daemon shall be started with the same plug-in options as flake8 (they
+are also read from the flake8 configuration file in the current working
+directory). Flake8 uses the daemon if the --requirements-daemon-socket
+option is given, and falls back to in-process resolution if the daemon is
+not available or was started with different options. Only projects within
+the daemon's working directory are resolved.
+
+"""
+import argparse
+import hashlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from logging import getLogger
+
+from .cache import file_fingerprint
+from .checker import Flake8Checker
+from .checker import ImportVisitor
+from .checker import get_stdlib_modules
+from .checker import modsplit
+from .cli import OptionManager
+
+LOG = getLogger('flake8.plugin.requirements')
+
+
+def get_options_key(checker):
+    """Get digest of options which affect I900 check results."""
+    key = json.dumps([
+        checker.get_index_key(),
+        sorted(get_stdlib_modules(checker.target_python)),
+    ])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def is_listening(path):
+    """Check whether any process listens on the given Unix socket."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(path)
+    except OSError:
+        return False
+    return True
+
+
+class DaemonClient(object):
+    """Client of the requirements resolution daemon.
+
+    Every process uses its own connection, so forked worker processes do
+    not share the connection inherited from the main process.
+
+    """
+
+    # Time limit for a single query, which might include the resolution of
+    # requirements of a project not known to the daemon yet.
+    timeout = 60
+
+    def __init__(self, path, key):
+        self.path = path
+        self.key = key
+        self.pid = None
+        self.sock = None
+        self.rfile = None
+
+    @classmethod
+    def connect(cls, path, key):
+        """Connect to the daemon, return None if it is not available."""
+        client = cls(path, key)
+        try:
+            client.request()
+        except (AttributeError, OSError, ValueError) as e:
+            # AF_UNIX sockets might not be supported on this platform.
+            LOG.info("Couldn't connect to resolution daemon: %s", e)
+            return None
+        return client
+
+    def request(self, **kw):
+        """Send request to the daemon and return its response."""
+        if self.pid != os.getpid():
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(self.timeout)
+            self.sock.connect(self.path)
+            self.rfile = self.sock.makefile("rb")
+            self.pid = os.getpid()
+        self.sock.sendall(json.dumps(dict(kw, key=self.key)).encode() + b"\n")
+        response = json.loads(self.rfile.readline())
+        if 'error' in response:
+            raise ValueError(response['error'])
+        return response
+
+    def query(self, root_dir, is_setup_py, modules):
+        """Get I900 errors (or None) for given modules of the project."""
+        return self.request(
+            root=os.path.abspath(root_dir),
+            setup_py=is_setup_py,
+            modules=[".".join(x) for x in modules],
+        )['errors']
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.query(json.loads(line))
+            except (KeyError, TypeError, ValueError, RuntimeError) as e:
+                response = {'error': str(e)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server with resolved indexes of checked projects.
+
+    Index of every project is kept as long as none of the files used for
+    its resolution changes, which is checked on every query. Only projects
+    within the base directory (current working directory by default) are
+    resolved, since resolution might evaluate project's setup.py file.
+
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, checker=Flake8Checker, base_dir=None):
+        self.checker = checker
+        self.base_dir = os.path.realpath(base_dir or os.getcwd())
+        self.key = get_options_key(checker)
+        # Fingerprints of resolution source files, indexed by the root.
+        self.sources = {}
+        # Resolution is not thread-safe, so process queries one by one.
+        self.lock = threading.Lock()
+        super().__init__(path, RequestHandler)
+
+    def server_bind(self):
+        # Other users shall not be able to connect, so create the socket
+        # with restricted permissions, instead of the process umask ones.
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+        os.chmod(self.server_address, 0o600)
+
+    def get_project(self, root_dir):
+        """Get project with up-to-date resolved index."""
+        project = self.checker.get_project(root_dir)
+        sources = self.sources.get(root_dir)
+        if sources is not None and any(
+                file_fingerprint(k) != v for k, v in sources.items()):
+            LOG.info("Requirements changed: %s", root_dir)
+            self.checker.invalidate(root_dir)
+            sources = None
+        if sources is None:
+            project.get_index()
+            self.sources[root_dir] = {
+                x: file_fingerprint(x)
+                for x in self.checker.resolution_sources.get(root_dir, ())
+            }
+        return project
+
+    def query(self, request):
+        if request['key'] != self.key:
+            return {'error': "Daemon started with different options"}
+        if 'root' not in request:
+            # Connection check.
+            return {}
+        root = os.path.realpath(request['root'])
+        if os.path.commonpath([self.base_dir, root]) != self.base_dir:
+            return {'error': "Project outside of the daemon directory"}
+        with self.lock:
+            checker = self.get_project(request['root'])(None, None)
+            checker.is_setup_py = request['setup_py']
+            verdicts = checker.project.get_verdicts(checker.is_setup_py)
+            errors = []
+            for module in map(modsplit, request['modules']):
+                if (verdict := verdicts.get(module)) is None:
+                    error = checker.check_I900(
+                        ImportVisitor.Import(0, 0, module))
+                    verdict = verdicts[module] = (error,) if error else ()
+                errors.append(verdict[0] if verdict else None)
+        return {'errors': errors}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m flake8_requirements.daemon",
+        description="Serve resolved requirements over a Unix socket.")
+    parser.add_argument(
+        "socket",
+        help="Path of the Unix socket to listen on.")
+    manager = OptionManager(parser)
+    Flake8Checker.add_options(manager)
+    manager.load_config(os.getcwd())
+    options = parser.parse_args(argv)
+
+    # The daemon answers I900 queries only.
+    options.select = ["I900"]
+    options.extend_select = []
+    options.output_file = None
+    options.benchmark = False
+    options.requirements_stats_file = None
+    options.requirements_daemon_socket = None
+    Flake8Checker.parse_options(options)
+
+    if os.path.exists(options.socket):
+        if is_listening(options.socket):
+            sys.stderr.write("Daemon already running: {}\n".format(
+                options.socket))
+            return 1
+        # Remove the socket left by a daemon which was killed.
+        os.unlink(options.socket)
+    # Shut down gracefully on SIGTERM, so the socket will be removed.
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+    server = Server(options.socket)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(options.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
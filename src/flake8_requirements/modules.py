@@ -1,11 +1,96 @@
-# List of all modules (standard library) available in Python 3.
+# List of all modules (standard library) available in Python 3.8. This list
+# (and changes for newer Python versions) is based on sys.stdlib_module_names,
+# with the addition of the __main__ module and the test package.
 STDLIB_PY3 = (
     "__future__",
     "__main__",
+    "_abc",
+    "_ast",
+    "_asyncio",
+    "_bisect",
+    "_blake2",
+    "_bootlocale",
+    "_bz2",
+    "_codecs",
+    "_codecs_cn",
+    "_codecs_hk",
+    "_codecs_iso2022",
+    "_codecs_jp",
+    "_codecs_kr",
+    "_codecs_tw",
+    "_collections",
+    "_collections_abc",
+    "_compat_pickle",
+    "_compression",
+    "_contextvars",
+    "_crypt",
+    "_csv",
+    "_ctypes",
+    "_curses",
+    "_curses_panel",
+    "_datetime",
+    "_dbm",
+    "_decimal",
     "_dummy_thread",
+    "_elementtree",
+    "_frozen_importlib",
+    "_frozen_importlib_external",
+    "_functools",
+    "_gdbm",
+    "_hashlib",
+    "_heapq",
+    "_imp",
+    "_io",
+    "_json",
+    "_locale",
+    "_lsprof",
+    "_lzma",
+    "_markupbase",
+    "_md5",
+    "_msi",
+    "_multibytecodec",
+    "_multiprocessing",
+    "_opcode",
+    "_operator",
+    "_osx_support",
+    "_overlapped",
+    "_pickle",
+    "_posixshmem",
+    "_posixsubprocess",
+    "_py_abc",
+    "_pydecimal",
+    "_pyio",
+    "_queue",
+    "_random",
+    "_scproxy",
+    "_sha1",
+    "_sha256",
+    "_sha3",
+    "_sha512",
+    "_signal",
+    "_sitebuiltins",
+    "_socket",
+    "_sqlite3",
+    "_sre",
+    "_ssl",
+    "_stat",
+    "_statistics",
+    "_string",
+    "_strptime",
+    "_struct",
+    "_symtable",
     "_thread",
+    "_threading_local",
+    "_tkinter",
+    "_tracemalloc",
+    "_uuid",
+    "_warnings",
+    "_weakref",
+    "_weakrefset",
+    "_winapi",
     "abc",
     "aifc",
+    "antigravity",
     "argparse",
     "array",
     "ast",
@@ -31,19 +116,20 @@ STDLIB_PY3 = (
     "code",
     "codecs",
     "codeop",
-    "collection",
     "collections",
     "colorsys",
     "compileall",
     "concurrent",
     "configparser",
     "contextlib",
+    "contextvars",
     "copy",
     "copyreg",
     "crypt",
     "csv",
     "ctypes",
     "curses",
+    "dataclasses",
     "datetime",
     "dbm",
     "decimal",
@@ -63,11 +149,11 @@ STDLIB_PY3 = (
     "fileinput",
     "fnmatch",
     "formatter",
-    "fpectl",
     "fractions",
     "ftplib",
     "functools",
     "gc",
+    "genericpath",
     "getopt",
     "getpass",
     "gettext",
@@ -79,6 +165,7 @@ STDLIB_PY3 = (
     "hmac",
     "html",
     "http",
+    "idlelib",
     "imaplib",
     "imghdr",
     "imp",
@@ -94,7 +181,6 @@ STDLIB_PY3 = (
     "locale",
     "logging",
     "lzma",
-    "macpath",
     "mailbox",
     "mailcap",
     "marshal",
@@ -108,8 +194,11 @@ STDLIB_PY3 = (
     "netrc",
     "nis",
     "nntplib",
+    "nt",
     "ntpath",
+    "nturl2path",
     "numbers",
+    "opcode",
     "operator",
     "optparse",
     "os",
@@ -134,6 +223,8 @@ STDLIB_PY3 = (
     "py_compile",
     "pyclbr",
     "pydoc",
+    "pydoc_data",
+    "pyexpat",
     "queue",
     "quopri",
     "random",
@@ -144,6 +235,7 @@ STDLIB_PY3 = (
     "rlcompleter",
     "runpy",
     "sched",
+    "secrets",
     "select",
     "selectors",
     "shelve",
@@ -158,6 +250,9 @@ STDLIB_PY3 = (
     "socketserver",
     "spwd",
     "sqlite3",
+    "sre_compile",
+    "sre_constants",
+    "sre_parse",
     "ssl",
     "stat",
     "statistics",
@@ -178,6 +273,7 @@ STDLIB_PY3 = (
     "termios",
     "test",
     "textwrap",
+    "this",
     "threading",
     "time",
     "timeit",
@@ -191,6 +287,7 @@ STDLIB_PY3 = (
     "turtle",
     "turtledemo",
     "types",
+    "typing",
     "unicodedata",
     "unittest",
     "urllib",
@@ -207,26 +304,113 @@ STDLIB_PY3 = (
     "xdrlib",
     "xml",
     "xmlrpc",
+    "zipapp",
     "zipfile",
     "zipimport",
     "zlib",
-    # Modules since Python 3.5
-    "typing",
-    "zipapp",
-    # Modules since Python 3.6
-    "secrets",
-    # Modules since Python 3.7
-    "contextvars",
-    "dataclasses",
-    # Modules since Python 3.9
-    "graphlib",
-    "zoneinfo",
-    # Modules since Python 3.11
-    "tomllib",
 )
 
-# Mapping for known 3rd party projects, which provide more than one module
-# or the name of the module is different than the project name itself.
+# Changes (added and removed modules) in the standard library.
+STDLIB_PY3_CHANGES = {
+    (3, 9): (
+        (
+            "_aix_support",
+            "_bootsubprocess",
+            "_peg_parser",
+            "_zoneinfo",
+            "graphlib",
+            "zoneinfo",
+        ),
+        (
+            "_dummy_thread",
+            "dummy_threading",
+        ),
+    ),
+    (3, 10): (
+        (),
+        (
+            "_bootlocale",
+            "_peg_parser",
+            "formatter",
+            "parser",
+            "symbol",
+        ),
+    ),
+    (3, 11): (
+        (
+            "_tokenize",
+            "_typing",
+            "tomllib",
+        ),
+        (
+            "binhex",
+        ),
+    ),
+    (3, 12): (
+        (
+            "_pydatetime",
+            "_pylong",
+            "_sha2",
+        ),
+        (
+            "_bootsubprocess",
+            "_sha256",
+            "_sha512",
+            "asynchat",
+            "asyncore",
+            "distutils",
+            "imp",
+            "smtpd",
+        ),
+    ),
+    (3, 13): (
+        (
+            "_android_support",
+            "_colorize",
+            "_interpchannels",
+            "_interpqueues",
+            "_interpreters",
+            "_ios_support",
+            "_opcode_metadata",
+            "_pyrepl",
+            "_suggestions",
+            "_sysconfig",
+            "_wmi",
+        ),
+        (
+            "_crypt",
+            "_msi",
+            "aifc",
+            "audioop",
+            "cgi",
+            "cgitb",
+            "chunk",
+            "crypt",
+            "imghdr",
+            "lib2to3",
+            "mailcap",
+            "msilib",
+            "nis",
+            "nntplib",
+            "ossaudiodev",
+            "pipes",
+            "sndhdr",
+            "spwd",
+            "sunau",
+            "telnetlib",
+            "uu",
+            "xdrlib",
+        ),
+    ),
+    (3, 14): (
+        (
+            "annotationlib",
+            "compression",
+        ),
+        (),
+    ),
+}
+
 KNOWN_3RD_PARTIES = {
     "absl-py": ["absl"],
     # NOTE: The allure-pytest package does not provide allure module directly
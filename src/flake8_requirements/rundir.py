@@ -0,0 +1,64 @@
+import glob
+import json
+import os
+import shutil
+import tempfile
+from logging import getLogger
+
+LOG = getLogger('flake8.plugin.requirements')
+
+
+class RunDirectory(object):
+    """Directory shared by all processes of a single flake8 run.
+
+    The directory is created by the main flake8 process, and its location is
+    passed to worker processes via the environment variable, so it works for
+    both fork and spawn multiprocessing start methods. Every process appends
+    records to its own files, so workers never wait for each other.
+
+    """
+
+    # Environment variable with the run directory location.
+    env = "FLAKE8_REQUIREMENTS_RUN_DIR"
+
+    def __init__(self):
+        """Create new run directory or attach to the inherited one."""
+        self.path = os.environ.get(self.env, "")
+        self.owner = None
+        if not os.path.isdir(self.path):
+            self.path = tempfile.mkdtemp(prefix="flake8-requirements-")
+            os.environ[self.env] = self.path
+            self.owner = os.getpid()
+
+    @property
+    def is_owner(self):
+        """Whether the directory was created by the current process."""
+        return self.owner == os.getpid()
+
+    def append(self, kind, record):
+        """Append JSON-serializable record to the current process file."""
+        path = os.path.join(self.path, "{}.{}".format(os.getpid(), kind))
+        try:
+            with open(path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except IOError as e:
+            LOG.error("Couldn't store run data: %s", e)
+
+    def read(self, kind):
+        """Iterate over records of given kind stored by all processes."""
+        for path in sorted(glob.glob(os.path.join(self.path, "*." + kind))):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # Process might have been killed during write.
+                        continue
+
+    def cleanup(self):
+        """Remove the run directory (only by the process which created it)."""
+        if not self.is_owner:
+            return
+        shutil.rmtree(self.path, ignore_errors=True)
+        if os.environ.get(self.env) == self.path:
+            del os.environ[self.env]
@@ -0,0 +1,58 @@
+class Stats(object):
+    """Wall time and call counts of requirements resolution phases.
+
+    Statistics are collected by every process separately. Worker processes
+    store them in the run directory at exit, and the main process merges
+    them with its own statistics before reporting.
+
+    """
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.phases = {}
+        self.counters = {}
+
+    def add_time(self, name, elapsed, calls=1):
+        """Record wall time spent in the given phase."""
+        phase = self.phases.setdefault(name, [0, 0.0])
+        phase[0] += calls
+        phase[1] += elapsed
+
+    def count(self, name, value=1):
+        """Increase the given counter."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def clear(self):
+        """Remove all recorded statistics."""
+        self.phases.clear()
+        self.counters.clear()
+
+    def dump(self):
+        """Convert statistics into JSON-serializable dictionary."""
+        return {
+            'phases': {
+                k: {'calls': calls, 'seconds': seconds}
+                for k, (calls, seconds) in sorted(self.phases.items())
+            },
+            'counters': dict(sorted(self.counters.items())),
+        }
+
+    def merge(self, data):
+        """Merge statistics created by the dump() method."""
+        for k, v in data.get('phases', {}).items():
+            self.add_time(k, v['seconds'], v['calls'])
+        for k, v in data.get('counters', {}).items():
+            self.count(k, v)
+
+    def format_benchmarks(self, prefix="requirements "):
+        """Format statistics in the flake8 --benchmark output format."""
+        benchmarks = []
+        for k, (calls, seconds) in sorted(self.phases.items()):
+            benchmarks.append(("{}{} calls".format(prefix, k), calls))
+            benchmarks.append(("{}{} seconds".format(prefix, k), seconds))
+        for k, v in sorted(self.counters.items()):
+            benchmarks.append((prefix + k, v))
+        return "".join(
+            "{:<10} {}\n".format(v, k) if isinstance(v, int) else
+            "{:<10.3} {}\n".format(v, k)
+            for k, v in benchmarks)
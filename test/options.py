@@ -0,0 +1,22 @@
+class Flake8Options:
+    known_modules = ""
+    requirements_file = None
+    requirements_max_depth = 1
+    scan_host_site_packages = False
+    requirements_cache_dir = None
+    root_dir_per_file = False
+    lookup_host_site_packages = False
+    setup_py_timeout = 0
+    target_python = None
+    select = None
+    extend_select = None
+    output_file = None
+    filenames = None
+    filename = ["*.py"]
+    exclude = []
+    extend_exclude = []
+    stdin_display_name = "stdin"
+    format = "default"
+    benchmark = False
+    requirements_stats_file = None
+    requirements_daemon_socket = None
@@ -0,0 +1,231 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from flake8_requirements.cache import ImportStore
+from flake8_requirements.cache import IndexCache
+from flake8_requirements.cache import MemoCache
+from flake8_requirements.checker import Flake8Checker
+from flake8_requirements.checker import memoize
+
+
+class MemoCacheTestCase(unittest.TestCase):
+
+    def test_statistics(self):
+        cache = MemoCache()
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.info(), MemoCache.Info(1, 1, 1, None))
+        cache.clear()
+        self.assertEqual(cache.info(), MemoCache.Info(0, 0, 0, None))
+
+    def test_lru_eviction(self):
+        cache = MemoCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        cache.resize(1)
+        self.assertEqual(cache.info().size, 1)
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_invalidate(self):
+        cache = MemoCache()
+        cache.set("a", 1, "/root/a")
+        cache.set("b", 2, "/root/b")
+        cache.invalidate("/root/a")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+
+    def test_memoize_invalidate_project(self):
+        memoize.cache.clear()
+        project_a = Flake8Checker.get_project("/root/a")
+        project_b = Flake8Checker.get_project("/root/b")
+        for project in (project_a, project_b):
+            project.get_setup_py_identity()
+        size = memoize.cache.info().size
+        Flake8Checker.invalidate("/root/a")
+        self.assertEqual(memoize.cache.info().size, size - 1)
+        with mock.patch('os.stat') as m:
+            project_b.get_setup_py_identity()
+            m.assert_not_called()
+            project_a.get_setup_py_identity()
+            m.assert_called_once_with("/root/a/setup.py")
+
+    def test_memoize_invalidate_main_project(self):
+        memoize.cache.clear()
+        project = Flake8Checker.get_project("/root/a")
+        project.get_setup_py_identity()
+        size = memoize.cache.info().size
+        Flake8Checker.invalidate(Flake8Checker.root_dir)
+        self.assertEqual(memoize.cache.info().size, size)
+        self.assertIs(Flake8Checker.get_project("/root/a"), project)
+        with mock.patch('os.stat') as m:
+            project.get_setup_py_identity()
+            m.assert_not_called()
+
+
+class IndexCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        memoize.cache.clear()
+        self.mtime = 0
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root_dir = os.path.join(self.tmp.name, "project")
+        os.mkdir(self.root_dir)
+        self.write("requirements.txt", "foo\n-r inner.txt\n")
+        self.write("inner.txt", "bar\n")
+        Flake8Checker.root_dir = self.root_dir
+        Flake8Checker.index_cache = IndexCache(
+            os.path.join(self.tmp.name, "cache"))
+
+    def tearDown(self):
+        Flake8Checker.root_dir = ""
+        Flake8Checker.index_cache = None
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.root_dir, name)
+        with open(path, "w") as f:
+            f.write(content)
+        # Make sure that modification is visible in the file fingerprint
+        # regardless of the file system timestamp resolution.
+        self.mtime += 1000000000
+        os.utime(path, ns=(self.mtime, self.mtime))
+
+    def get_index(self):
+        memoize.cache.clear()
+        return Flake8Checker.get_index()
+
+    def test_store_and_load(self):
+        index = self.get_index()
+        self.assertIn(("foo",), index.mods_3rd_party)
+        self.assertIn(("bar",), index.mods_3rd_party)
+        with mock.patch.object(Flake8Checker, 'get_mods_3rd_party') as m:
+            cached = self.get_index()
+            m.assert_not_called()
+        self.assertEqual(cached, index)
+
+    def test_invalidate_on_change(self):
+        self.get_index()
+        self.write("inner.txt", "baz\n")
+        index = self.get_index()
+        self.assertNotIn(("bar",), index.mods_3rd_party)
+        self.assertIn(("baz",), index.mods_3rd_party)
+
+    def test_invalidate_on_new_file(self):
+        self.get_index()
+        self.write("pyproject.toml", "[project]\ndependencies = ['qux']\n")
+        index = self.get_index()
+        self.assertIn(("qux",), index.mods_3rd_party)
+
+    def test_invalidate_on_setup_py_file_change(self):
+        os.mkdir(os.path.join(self.root_dir, "reqs"))
+        self.write(os.path.join("reqs", "base.txt"), "requests\n")
+        self.write("setup.py", "\n".join((
+            "import os",
+            "from setuptools import setup",
+            "path = os.path.join(os.path.dirname(__file__), 'reqs/base.txt')",
+            "with open(path) as f:",
+            "    requires = f.read().split()",
+            "setup({})".format(",".join((
+                "name='project'",
+                "version='1'",
+                "author='A'",
+                "packages=['']",
+                "install_requires=requires",
+            ))),
+        )))
+        # Files opened by setup.py are recorded in a separate process only.
+        with mock.patch.object(Flake8Checker, 'setup_py_timeout', 10):
+            self.get_index()
+            self.write(
+                os.path.join("reqs", "base.txt"), "requests\nflask\n")
+            index = self.get_index()
+        self.assertIn(("flask",), index.mods_3rd_party)
+
+    def test_setup_py_evaluated_in_process_not_stored(self):
+        self.write("setup.py", "\n".join((
+            "requires = 'requests'.split()",
+            "setup({})".format(",".join((
+                "name='project'",
+                "version='1'",
+                "author='A'",
+                "packages=['']",
+                "install_requires=requires",
+            ))),
+        )))
+        self.get_index()
+        with mock.patch.object(
+                Flake8Checker, 'get_mods_3rd_party',
+                side_effect=Flake8Checker.get_mods_3rd_party) as m:
+            index = self.get_index()
+            m.assert_called()
+        self.assertIn(("requests",), index.mods_3rd_party)
+
+    def test_invalidate_on_options_change(self):
+        self.get_index()
+        with mock.patch.object(Flake8Checker, 'known_modules', {
+                "foo": ["foo_module"]}):
+            index = self.get_index()
+        self.assertIn(("foo_module",), index.mods_3rd_party)
+
+
+class ImportStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache", "imports.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_store_and_load(self):
+        store = ImportStore(self.path)
+        key = store.get_key(b"import foo\n", "1.0")
+        self.assertIsNone(store.load(key))
+        store.store(key, [[1, 0, "foo"]])
+        self.assertEqual(ImportStore(self.path).load(key), [[1, 0, "foo"]])
+
+    def test_eviction(self):
+        store = ImportStore(self.path)
+        with mock.patch('time.time', return_value=1000000000):
+            store.store(b"old", [[1, 0, "foo"]])
+        store.store(b"new", [[1, 0, "bar"]])
+        # Entries are evicted when the database is opened.
+        self.assertEqual(store.load(b"old"), [[1, 0, "foo"]])
+        store = ImportStore(self.path)
+        self.assertIsNone(store.load(b"old"))
+        self.assertEqual(store.load(b"new"), [[1, 0, "bar"]])
+
+    def test_key(self):
+        key = ImportStore.get_key(b"import foo\n", "1.0")
+        self.assertEqual(key, ImportStore.get_key(b"import foo\n", "1.0"))
+        self.assertNotEqual(key, ImportStore.get_key(b"import bar\n", "1.0"))
+        self.assertNotEqual(key, ImportStore.get_key(b"import foo\n", "2.0"))
+
+    def test_multiple_processes(self):
+        store = ImportStore(self.path)
+        store.load(b"")
+
+        def worker(n):
+            for i in range(50):
+                store.store(b"%d:%d" % (n, i), [[i, 0, "mod"]])
+
+        ctx = multiprocessing.get_context("fork")
+        workers = [ctx.Process(target=worker, args=(n,)) for n in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+            self.assertEqual(w.exitcode, 0)
+        for n in range(4):
+            for i in range(50):
+                self.assertEqual(
+                    store.load(b"%d:%d" % (n, i)), [[i, 0, "mod"]])
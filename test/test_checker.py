@@ -1,8 +1,14 @@
 import ast
+import os
+import sys
+import tempfile
 import unittest
+from unittest import mock
 
 from flake8_requirements import checker
 
+from options import Flake8Options  # noqa: I900
+
 
 class SetupVisitorMock(checker.SetupVisitor):
 
@@ -38,18 +44,14 @@ class Flake8OptionManagerMock(dict):
     def add_option(self, name, **kw):
         self[name] = kw
 
-
-class Flake8Options:
-    known_modules = ""
-    requirements_file = None
-    requirements_max_depth = 1
-    scan_host_site_packages = False
+    def extend_default_ignore(self, codes):
+        self.default_ignore = codes
 
 
 def check(code, filename="<unknown>", options=None):
     if options is None:
         options = Flake8Options
-    checker.memoize.mem = {}
+    checker.memoize.cache.clear()
     Flake8Checker.parse_options(options)
     return list(Flake8Checker(ast.parse(code), filename).run())
 
@@ -61,10 +63,45 @@ class Flake8CheckerTestCase(unittest.TestCase):
         Flake8Checker.add_options(manager)
         self.assertEqual(
             sorted(manager.keys()),
-            ['--known-modules', '--requirements-file',
-             '--requirements-max-depth', '--scan-host-site-packages'],
+            ['--known-modules', '--lookup-host-site-packages',
+             '--requirements-cache-dir', '--requirements-daemon-socket',
+             '--requirements-file', '--requirements-max-depth',
+             '--requirements-stats-file', '--root-dir-per-file',
+             '--scan-host-site-packages', '--setup-py-timeout',
+             '--target-python'],
         )
 
+    def test_parse_options_resolves_index(self):
+        checker.memoize.cache.clear()
+        Flake8Checker.parse_options(Flake8Options)
+        # All requirements shall be resolved before checking any file.
+        with mock.patch.object(Flake8Checker, 'get_setup_py') as m:
+            errors = list(Flake8Checker(ast.parse("import foo"), "x.py").run())
+            m.assert_not_called()
+        self.assertEqual(len(errors), 0)
+
+    def test_parse_options_resolution_error(self):
+        checker.memoize.cache.clear()
+        with mock.patch.object(
+                Flake8Checker, 'get_setup_py',
+                side_effect=SyntaxError("invalid syntax")):
+            # Errors shall be postponed until the index is actually used.
+            Flake8Checker.parse_options(Flake8Options)
+
+    def test_parse_options_other_errors_selected(self):
+        class Options(Flake8Options):
+            select = ["E", "W"]
+        checker.memoize.cache.clear()
+        with mock.patch.object(Flake8Checker, 'get_setup_py') as m:
+            Flake8Checker.parse_options(Options)
+            errors = list(Flake8Checker(
+                ast.parse("import cprofile"), "x.py").run())
+            m.assert_not_called()
+        self.assertEqual(len(errors), 0)
+        Options.select = ["E", "I900"]
+        errors = check("import cprofile", options=Options)
+        self.assertEqual(len(errors), 1)
+
     def test_stdlib(self):
         errors = check("import os\nfrom unittest import TestCase")
         self.assertEqual(len(errors), 0)
@@ -79,6 +116,33 @@ class Flake8CheckerTestCase(unittest.TestCase):
             "I900 'cprofile' not listed as a requirement",
         )
 
+    def test_stdlib_target_python(self):
+        class Options(Flake8Options):
+            target_python = "3.11"
+        errors = check("import distutils\nimport tomllib", options=Options)
+        self.assertEqual(len(errors), 0)
+        Options.target_python = "3.12"
+        errors = check("import distutils\nimport tomllib", options=Options)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(
+            errors[0][2],
+            "I900 'distutils' not listed as a requirement",
+        )
+        Options.target_python = "3.8"
+        errors = check("import distutils\nimport tomllib", options=Options)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(
+            errors[0][2],
+            "I900 'tomllib' not listed as a requirement",
+        )
+
+    def test_stdlib_modules(self):
+        if hasattr(sys, 'stdlib_module_names'):
+            self.assertEqual(
+                checker.get_stdlib_modules(sys.version_info[:2]),
+                checker.get_stdlib_modules(),
+            )
+
     def test_1st_party(self):
         errors = check("import flake8_requires")
         self.assertEqual(len(errors), 0)
@@ -119,6 +183,93 @@ class Flake8CheckerTestCase(unittest.TestCase):
             "I900 'cat' not listed as a requirement",
         )
 
+    def test_nested_imports(self):
+        lines = [
+            "import a",
+            "class C:",
+            " def f(self):",
+            "  if x:",
+            "   import b",
+            "  elif y:",
+            "   import c",
+            "  else:",
+            "   import d",
+            "try:",
+            " import e",
+            "except ImportError:",
+            " import f",
+            "else:",
+            " import g",
+            "finally:",
+            " import h",
+            "for x in y:",
+            " with z:",
+            "  import i",
+            "else:",
+            " import j",
+            "while x:",
+            " async def f():",
+            "  import k",
+            "lambda: __import__('m')",
+        ]
+        expected = "abcdefghijk"
+        if sys.version_info >= (3, 10):
+            lines.extend((
+                "match x:",
+                " case 1:",
+                "  import l",
+            ))
+            expected += "l"
+        visitor = checker.ImportVisitor(ast.parse("\n".join(lines)))
+        self.assertEqual(
+            "".join(x.module[0] for x in visitor.imports),
+            expected)
+
+    def test_deeply_nested_expression(self):
+        code = "x = {}\nimport cat".format("+".join(["1"] * 2000))
+        errors = check(code)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0][0], 2)
+
+    def test_module_set(self):
+        mods = checker.ModuleSet()
+        mods.add(("foo",), "foo")
+        mods.add(("foo", "bar", "baz"), "foo-bar-baz")
+        mods.add(("space", "module"), "space-module")
+        self.assertEqual(mods.depth, 3)
+        self.assertEqual(mods.lookup(("foo",)), "foo")
+        self.assertEqual(mods.lookup(("foo", "bar")), "foo")
+        # The longest registered module wins.
+        self.assertEqual(
+            mods.lookup(("foo", "bar", "baz", "x")), "foo-bar-baz")
+        self.assertEqual(mods.lookup(("space", "module", "x")), "space-module")
+        self.assertIsNone(mods.lookup(("space",)))
+        self.assertIn(("space", "module"), mods)
+        self.assertNotIn(("space", "other"), mods)
+        self.assertEqual(checker.ModuleSet(mods.walk()), mods)
+        self.assertEqual(checker.ModuleSet(mods.walk()).depth, 3)
+
+    def test_duplicated_imports(self):
+        code = "import cat\nimport foo\ndef f():\n import cat"
+        errors = check(code)
+        self.assertEqual([x[:2] for x in errors], [(1, 0), (4, 1)])
+        with mock.patch.object(
+                Flake8Checker, 'check_I900',
+                side_effect=Flake8Checker.check_I900, autospec=True) as m:
+            errors = list(Flake8Checker(ast.parse(code), "x.py").run())
+            errors += list(Flake8Checker(ast.parse(code), "y.py").run())
+            # Modules were already checked by the check() call.
+            m.assert_not_called()
+        self.assertEqual(len(errors), 4)
+        # Results are bound to the lifetime of the resolved index.
+        Flake8Checker.invalidate()
+        with mock.patch.object(
+                Flake8Checker, 'check_I900',
+                side_effect=Flake8Checker.check_I900, autospec=True) as m:
+            errors = list(Flake8Checker(ast.parse(code), "x.py").run())
+            self.assertEqual(m.call_count, 2)
+        self.assertEqual(len(errors), 2)
+
     def test_namespace(self):
         errors = check("import space.module")
         self.assertEqual(len(errors), 0)
@@ -151,6 +302,76 @@ class Flake8CheckerTestCase(unittest.TestCase):
                 ['flake8'],
             )
 
+    def create_site_packages(self, tmp):
+        files = {
+            "Foo_Bar-1.0.dist-info/top_level.txt": "foobar\nfoo_bar\n",
+            "Foo_Bar-1.0.dist-info/RECORD": "",
+            "python_baz-2.0.dist-info/RECORD": "\n".join((
+                "baz/__init__.py,sha256=x,0",
+                "baz/__pycache__/__init__.cpython-311.pyc,,",
+                "_baz.cpython-311-x86_64-linux-gnu.so,sha256=x,0",
+                "baz_compat.py,sha256=x,0",
+                "baz.pth,sha256=x,0",
+                "python_baz-2.0.dist-info/METADATA,sha256=x,0",
+                "python_baz-2.0.data/scripts/baz,sha256=x,0",
+                "../../../bin/baz,sha256=x,0",
+            )),
+            "Legacy-0.1-py3.11.egg-info/top_level.txt": "legacy\n",
+            "empty-0.1.dist-info/METADATA": "",
+            "zope_interface-5.0.dist-info/METADATA": "\n".join((
+                "Metadata-Version: 2.1",
+                "Name: zope.interface",
+                "Version: 5.0",
+                "",
+                "Name: not a header",
+            )),
+            "zope_interface-5.0.dist-info/top_level.txt": "zope\n",
+        }
+        for name, content in files.items():
+            os.makedirs(
+                os.path.join(tmp, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(tmp, name), "w") as f:
+                f.write(content)
+
+    def test_discover_host_3rd_party_modules_dist_info(self):
+        checker.memoize.cache.clear()
+        with tempfile.TemporaryDirectory() as tmp:
+            self.create_site_packages(tmp)
+            with mock.patch('site.getsitepackages', return_value=[tmp]), \
+                    mock.patch('site.getusersitepackages', return_value=""):
+                mapping = Flake8Checker.discover_host_3rd_party_modules()
+        self.assertEqual(mapping, {
+            "foo_bar": ["foobar", "foo_bar"],
+            "python_baz": ["baz", "_baz", "baz_compat"],
+            "baz": ["baz", "_baz", "baz_compat"],
+            "legacy": ["legacy"],
+            "zope.interface": ["zope"],
+        })
+
+    def test_lookup_host_3rd_party_modules(self):
+        class Checker(Flake8Checker):
+            @classmethod
+            def get_mods_3rd_party_requirements(cls, is_setup_py):
+                return list(checker.parse_requirements([
+                    "foo.bar", "legacy", "other"]))
+        checker.memoize.cache.clear()
+        Checker.lookup_host_site_packages = True
+        with tempfile.TemporaryDirectory() as tmp:
+            self.create_site_packages(tmp)
+            with mock.patch('site.getsitepackages', return_value=[tmp]), \
+                    mock.patch('site.getusersitepackages', return_value=""), \
+                    mock.patch.object(
+                        checker.Flake8Checker, 'read_host_dist',
+                        wraps=checker.Flake8Checker.read_host_dist) as m:
+                mods = Checker.get_mods_3rd_party(False)
+                # Only metadata of required projects shall be read.
+                self.assertEqual(m.call_count, 2)
+        self.assertIn(("foobar",), mods)
+        self.assertIn(("foo_bar",), mods)
+        self.assertIn(("legacy",), mods)
+        self.assertIn(("other",), mods)
+        self.assertNotIn(("baz",), mods)
+
     def test_custom_mapping_parser(self):
         class Options(Flake8Options):
             known_modules = ":[pydrmcodec],mylib:[mylib.drm,mylib.ex]"
@@ -176,3 +397,95 @@ class Flake8CheckerTestCase(unittest.TestCase):
             errors[0][2],
             "I900 'setuptools' not listed as a requirement",
         )
+
+    def test_root_dir_per_file(self):
+        class Options(Flake8Options):
+            root_dir_per_file = True
+        with tempfile.TemporaryDirectory() as tmp:
+            for project, requirement in (("a", "foo"), ("b", "bar")):
+                os.makedirs(os.path.join(tmp, project, "src", "pkg"))
+                path = os.path.join(tmp, project, "requirements.txt")
+                with open(path, "w") as f:
+                    f.write(requirement)
+            checker.memoize.cache.clear()
+            checker.Flake8Checker.parse_options(Options)
+            try:
+                def check(code, *path):
+                    filename = os.path.join(tmp, *path)
+                    tree = ast.parse(code)
+                    return list(checker.Flake8Checker(tree, filename).run())
+                self.assertEqual(len(check("import foo", "a/src/x.py")), 0)
+                self.assertEqual(len(check("import bar", "a/src/x.py")), 1)
+                self.assertEqual(len(check("import foo", "b/src/x.py")), 1)
+                self.assertEqual(len(check("import bar", "b/src/x.py")), 0)
+                # Directories visited during discovery shall be cached.
+                with mock.patch('os.path.exists', wraps=os.path.exists) as m:
+                    self.assertEqual(len(check("import bar", "b/src/y.py")), 0)
+                    self.assertEqual(m.call_count, 0)
+            finally:
+                checker.Flake8Checker.root_dir_per_file = False
+
+    def test_root_dir_per_file_resolves_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            class Options(Flake8Options):
+                root_dir_per_file = True
+                filenames = [tmp]
+            for project, requirement in (("a", "foo"), ("b", "bar")):
+                os.makedirs(os.path.join(tmp, project, "src"))
+                path = os.path.join(tmp, project, "requirements.txt")
+                with open(path, "w") as f:
+                    f.write(requirement)
+                path = os.path.join(tmp, project, "src", "x.py")
+                with open(path, "w") as f:
+                    f.write("import " + requirement)
+            checker.memoize.cache.clear()
+            checker.Flake8Checker.parse_options(Options)
+            try:
+                # Requirements of every project containing checked files
+                # shall be resolved before checking any file.
+                with mock.patch.object(
+                        checker.Flake8Checker, 'get_setup_py') as m:
+                    for project in ("a", "b"):
+                        filename = os.path.join(tmp, project, "src", "x.py")
+                        with open(filename) as f:
+                            tree = ast.parse(f.read())
+                        self.assertEqual(len(list(checker.Flake8Checker(
+                            tree, filename).run())), 0)
+                    m.assert_not_called()
+            finally:
+                checker.Flake8Checker.root_dir_per_file = False
+
+    def test_setup_py_identity_check_per_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "setup.py")
+            with open(filename, "w") as f:
+                f.write("")
+            tree = ast.parse("\n".join(
+                "from setuptools import mod{}".format(i) for i in range(50)))
+            try:
+                checker.memoize.cache.clear()
+                checker.Flake8Checker.root_dir = tmp
+                checker.Flake8Checker.get_index()
+                with mock.patch('os.stat', wraps=os.stat) as m_stat, \
+                        mock.patch('os.path.samefile') as m_samefile:
+                    # Project's setup.py and the checked file.
+                    errors = list(checker.Flake8Checker(tree, filename).run())
+                    self.assertEqual(m_stat.call_count, 2)
+                    # Project's setup.py identity is cached per root, so only
+                    # the checked file is examined (once for all imports).
+                    errors = list(checker.Flake8Checker(tree, filename).run())
+                    self.assertEqual(m_stat.call_count, 3)
+                    m_samefile.assert_not_called()
+            finally:
+                checker.Flake8Checker.root_dir = ""
+            self.assertEqual(len(errors), 0)
+
+    def test_known_3rd_parties(self):
+        checker.memoize.cache.clear()
+        self.assertEqual(
+            Flake8Checker.get_known_3rd_parties()["pyyaml"], ["yaml"])
+        self.assertEqual(
+            Flake8Checker.get_known_3rd_parties_reverse()["yaml"], ["pyyaml"])
+        self.assertIn(
+            "setuptools",
+            Flake8Checker.get_known_3rd_parties_reverse()["pkg_resources"])
@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from flake8_requirements import cli
+from flake8_requirements.checker import Flake8Checker
+
+
+class CommandLineInterfaceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root_dir = os.path.realpath(self.tmp.name)
+        os.chdir(self.root_dir)
+        self.write("requirements.txt", "foo\nbar\n")
+        self.write("pkg/a.py", "import foo\nimport baz\nimport os\n")
+        self.write("pkg/b.py", "import foo.x\nimport qux\n")
+        self.write(".git/c.py", "import qux\n")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        Flake8Checker.error_I901_enabled = False
+        Flake8Checker.root_dir = ""
+        self.tmp.cleanup()
+
+    def write(self, path, content):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def main(self, *args):
+        output = os.path.join(self.root_dir, "output")
+        with mock.patch('atexit.register'):
+            code = cli.main(list(args) + ["--output-file", output])
+        with open(output) as f:
+            return code, f.read()
+
+    def test_find_files(self):
+        self.write("pkg/d.txt", "")
+        self.assertEqual(
+            list(cli.find_files(["pkg", "x.txt"], cli.EXCLUDE.split(","))),
+            ["pkg/a.py", "pkg/b.py", "x.txt"])
+        self.assertEqual(
+            list(cli.find_files(["."], ["pkg"])),
+            ["./.git/c.py"])
+
+    def test_text(self):
+        self.assertEqual(self.main("-j", "1"), (1, "".join((
+            "./pkg/a.py:2:1: I900 'baz' not listed as a requirement\n",
+            "./pkg/b.py:2:1: I900 'qux' not listed as a requirement\n",
+        ))))
+
+    def test_text_no_errors(self):
+        self.write("requirements.txt", "foo\nbaz\nqux\n")
+        self.assertEqual(self.main("-j", "1", "pkg"), (0, ""))
+
+    def test_text_multiple_jobs(self):
+        self.assertEqual(self.main("-j", "1"), self.main("-j", "2"))
+
+    def test_select_unused(self):
+        code, output = self.main("-j", "2", "--select", "I901")
+        self.assertEqual(code, 1)
+        self.assertEqual(output, (
+            "{}:2:1: I901 'bar' required but not used\n".format(
+                os.path.join(self.root_dir, "requirements.txt"))))
+        self.assertIsNone(Flake8Checker.run_dir)
+
+    def test_stats_file(self):
+        stats_file = os.path.join(self.root_dir, "stats.json")
+        self.main("-j", "2", "--requirements-stats-file", stats_file)
+        with open(stats_file) as f:
+            stats = json.load(f)
+        self.assertEqual(stats['counters']['imports'], 5)
+        self.assertEqual(stats['counters']['processes'], 3)
+        self.assertIsNone(Flake8Checker.run_dir)
+
+    def test_syntax_error(self):
+        self.write("pkg/d.py", "def (:\n")
+        with mock.patch('sys.stderr') as stderr:
+            code, _ = self.main("-j", "1", "pkg")
+        self.assertEqual(code, 1)
+        self.assertIn("pkg/d.py: ", stderr.write.call_args[0][0])
+
+    def test_json(self):
+        code, output = self.main("-j", "1", "--format", "json", "pkg/a.py")
+        self.assertEqual(json.loads(output), [{
+            'filename': "pkg/a.py",
+            'line': 2,
+            'column': 1,
+            'code': "I900",
+            'text': "'baz' not listed as a requirement",
+        }])
+
+    def test_sarif(self):
+        code, output = self.main(
+            "-j", "1", "--format", "sarif", "--select", "I900,I901", "pkg")
+        sarif = json.loads(output)
+        self.assertEqual(sarif['version'], "2.1.0")
+        results = sarif['runs'][0]['results']
+        self.assertEqual(
+            [x['ruleId'] for x in results],
+            ["I900", "I900", "I901"])
+        self.assertEqual(
+            [x['locations'][0]['physicalLocation'] for x in results][-1],
+            {
+                'artifactLocation': {'uri': "requirements.txt"},
+                'region': {'startLine': 2, 'startColumn': 1},
+            })
+
+    def test_config(self):
+        self.write("custom.txt", "foo\nbaz\nqux\n")
+        self.write("setup.cfg", "[flake8]\nrequirements-file = custom.txt\n")
+        self.assertEqual(self.main("-j", "1"), (0, ""))
+
+    def test_incremental(self):
+        args = ("-j", "1", "--select", "I900,I901", "--incremental", "m.json")
+        expected = self.main(*args)
+        with mock.patch.object(cli, 'check_file') as m:
+            self.assertEqual(self.main(*args), expected)
+            m.assert_not_called()
+        self.write("pkg/b.py", "import foo.x\nimport bar\n")
+        with mock.patch.object(cli, 'check_file', wraps=cli.check_file) as m:
+            self.assertEqual(self.main(*args), (1, "".join((
+                "./pkg/a.py:2:1: I900 'baz' not listed as a requirement\n",
+            ))))
+            self.assertEqual(
+                [x[0][0] for x in m.call_args_list], ["./pkg/b.py"])
+
+    def test_incremental_requirements_changed(self):
+        args = ("-j", "1", "--incremental", "m.json")
+        self.main(*args)
+        self.write("requirements.txt", "foo\nbar\nbaz\n")
+        with mock.patch.object(cli, 'check_file', wraps=cli.check_file) as m:
+            self.assertEqual(self.main(*args), (1, "".join((
+                "./pkg/b.py:2:1: I900 'qux' not listed as a requirement\n",
+            ))))
+            self.assertEqual(m.call_count, 2)
+
+    def test_import_store(self):
+        args = ("-j", "1", "--requirements-cache-dir", ".cache")
+        expected = self.main(*args)
+        self.assertTrue(os.path.exists(".cache/imports.sqlite"))
+        with mock.patch('ast.parse') as m:
+            self.assertEqual(self.main(*args), expected)
+            m.assert_not_called()
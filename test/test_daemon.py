@@ -0,0 +1,127 @@
+import ast
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from flake8_requirements.checker import Flake8Checker
+from flake8_requirements.checker import memoize
+from flake8_requirements.daemon import Server
+
+from options import Flake8Options  # noqa: I900
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "Unix sockets not supported")
+class DaemonTestCase(unittest.TestCase):
+
+    def setUp(self):
+        memoize.cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root_dir = os.path.realpath(self.tmp.name)
+        self.write("requirements.txt", "foo\n")
+        self.socket = os.path.join(self.root_dir, "daemon.sock")
+        self.daemon = None
+
+    def tearDown(self):
+        if self.daemon is not None:
+            self.daemon.terminate()
+            self.daemon.wait()
+        Flake8Checker.daemon = None
+        Flake8Checker.root_dir = ""
+        self.tmp.cleanup()
+
+    def write(self, path, content):
+        with open(os.path.join(self.root_dir, path), "w") as f:
+            f.write(content)
+
+    def start_daemon(self, *args):
+        # Do not measure code coverage of the subprocess.
+        env = {k: v for k, v in os.environ.items() if not k.startswith("COV_")}
+        self.daemon = subprocess.Popen(
+            [sys.executable, "-m", "flake8_requirements.daemon", self.socket]
+            + list(args), cwd=self.root_dir, env=env)
+        for _ in range(100):
+            if os.path.exists(self.socket):
+                return
+            time.sleep(0.05)
+        self.fail("Daemon not started")
+
+    def parse_options(self, **kw):
+        options = Flake8Options()
+        options.requirements_daemon_socket = self.socket
+        for k, v in kw.items():
+            setattr(options, k, v)
+        with mock.patch('os.getcwd', return_value=self.root_dir):
+            Flake8Checker.parse_options(options)
+
+    def check(self, code):
+        filename = os.path.join(self.root_dir, "test.py")
+        return [x[2] for x in Flake8Checker(ast.parse(code), filename).run()]
+
+    def test_daemon(self):
+        self.start_daemon()
+        with mock.patch.object(Flake8Checker, 'get_index') as m:
+            self.parse_options()
+            self.assertIsNotNone(Flake8Checker.daemon)
+            self.assertEqual(self.check("import foo\nimport bar\nimport os"), [
+                "I900 'bar' not listed as a requirement"])
+            m.assert_not_called()
+
+    def test_daemon_socket_permissions(self):
+        self.start_daemon()
+        self.assertEqual(os.stat(self.socket).st_mode & 0o777, 0o600)
+
+    def test_daemon_project_outside(self):
+        self.start_daemon()
+        self.parse_options()
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                Flake8Checker.daemon.query(tmp, False, [("foo",)])
+        self.assertEqual(
+            Flake8Checker.daemon.query(self.root_dir, False, [("bar",)]),
+            ["I900 'bar' not listed as a requirement"])
+
+    def test_daemon_invalidate(self):
+        self.start_daemon()
+        self.parse_options()
+        self.assertEqual(len(self.check("import bar")), 1)
+        self.write("requirements.txt", "foo\nbar\n\n")
+        memoize.cache.clear()
+        self.assertEqual(len(self.check("import bar")), 0)
+
+    def test_daemon_not_available(self):
+        self.parse_options()
+        self.assertIsNone(Flake8Checker.daemon)
+        self.assertEqual(len(self.check("import bar")), 1)
+
+    def test_daemon_options_mismatch(self):
+        self.start_daemon("--known-modules=bar:[baz]")
+        self.parse_options()
+        self.assertIsNone(Flake8Checker.daemon)
+
+    def test_daemon_failure(self):
+        self.start_daemon()
+        self.parse_options()
+        self.daemon.terminate()
+        self.daemon.wait()
+        self.daemon = None
+        Flake8Checker.daemon.pid = None
+        self.assertEqual(len(self.check("import bar")), 1)
+        self.assertIsNone(Flake8Checker.daemon)
+
+    def test_daemon_verdicts_cache(self):
+        server = Server(self.socket, base_dir=self.root_dir)
+        self.addCleanup(server.server_close)
+        request = {
+            'key': server.key, 'root': self.root_dir, 'setup_py': False,
+            'modules': ["foo", "bar"]}
+        with mock.patch.object(
+                Flake8Checker, 'check_I900',
+                autospec=True, side_effect=Flake8Checker.check_I900) as m:
+            for _ in range(2):
+                self.assertEqual(server.query(request), {'errors': [
+                    None, "I900 'bar' not listed as a requirement"]})
+            self.assertEqual(m.call_count, 2)
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Modules which shall be imported only in code paths which need them.
+LAZY_MODULES = (
+    "concurrent.futures",
+    "configparser",
+    "flake8_requirements.daemon",
+    "flake8_requirements.modules",
+    "flake8_requirements.rundir",
+    "flake8_requirements.stats",
+    "hashlib",
+    "json",
+    "multiprocessing",
+    "packaging",
+    "socket",
+    "sqlite3",
+    "subprocess",
+    "tempfile",
+    "tomli",
+    "tomllib",
+)
+
+
+def python(*args):
+    # Do not measure code coverage of the subprocess.
+    env = {k: v for k, v in os.environ.items() if not k.startswith("COV_")}
+    return subprocess.run(
+        [sys.executable] + list(args),
+        capture_output=True, check=True, env=env, text=True)
+
+
+class ImportTimeTestCase(unittest.TestCase):
+
+    def test_lazy_imports(self):
+        p = python("-c", "; ".join((
+            "import sys",
+            "modules = set(sys.modules)",
+            "import flake8_requirements",
+            "print('\\n'.join(set(sys.modules) - modules))",
+        )))
+        imported = p.stdout.split()
+        self.assertIn("flake8_requirements.checker", imported)
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, imported)
+
+    def test_lazy_packaging_import(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "requirements.txt"), "w") as f:
+                f.write("foo >= 1.0\nbar[baz]\n")
+            p = python("-c", "; ".join((
+                "import sys",
+                "from flake8_requirements.checker import Flake8Checker",
+                "Flake8Checker.root_dir = sys.argv[1]",
+                "index = Flake8Checker.get_index()",
+                "assert ('foo',) in index.mods_3rd_party",
+                "print('packaging' in sys.modules)",
+            )), tmp)
+        self.assertEqual(p.stdout.strip(), "False")
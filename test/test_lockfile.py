@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from unittest.mock import mock_open
+
+from flake8_requirements.checker import Flake8Checker
+from flake8_requirements.checker import memoize
+
+
+class LockfileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        memoize.cache.clear()
+
+    def tearDown(self):
+        Flake8Checker.requirements_file = None
+        Flake8Checker.root_dir = ""
+
+    def read(self, name, content):
+        with mock.patch('builtins.open', mock_open(read_data=content)):
+            requirements = Flake8Checker.read_lockfile(name)
+        return [str(x) for x in requirements]
+
+    def test_uv_lock(self):
+        content = b"\n".join((
+            b"version = 1",
+            b"[[package]]",
+            b'name = "project"',
+            b'version = "0.1.0"',
+            b'source = { editable = "." }',
+            b'dependencies = [{ name = "requests" }, { name = "tool" }]',
+            b"[package.optional-dependencies]",
+            b'yaml = [{ name = "pyyaml" }]',
+            b"[package.dev-dependencies]",
+            b'dev = [{ name = "pytest" }, { name = "requests" }]',
+            b"[[package]]",
+            b'name = "tool"',
+            b'version = "0.1.0"',
+            b'source = { editable = "tool" }',
+            b'dependencies = [{ name = "click" }]',
+            b"[[package]]",
+            b'name = "requests"',
+            b'version = "2.31.0"',
+            b'source = { registry = "https://pypi.org/simple" }',
+            b'dependencies = [{ name = "urllib3" }]',
+        ))
+        # Dependencies of locked packages are not direct requirements.
+        self.assertEqual(
+            self.read("uv.lock", content),
+            ["requests", "pyyaml", "pytest", "click"])
+
+    def test_pipfile(self):
+        content = b"\n".join((
+            b"[packages]",
+            b'requests = "==2.31.0"',
+            b"[dev-packages]",
+            b'pytest = { git = "https://github.com/pytest-dev/pytest" }',
+        ))
+        self.assertEqual(
+            self.read("Pipfile", content),
+            ["requests", "pytest"])
+
+    def test_invalid_lock(self):
+        self.assertEqual(self.read("uv.lock", b"[[package]]\n"), [])
+        self.assertEqual(self.read("uv.lock", b"[[package"), [])
+
+    def test_3rd_party(self):
+        with tempfile.TemporaryDirectory() as root_dir:
+            with open(os.path.join(root_dir, "Pipfile.lock"), "w") as f:
+                f.write(json.dumps({'default': {
+                    'PyYAML': {'version': "==6.0"},
+                    'idna': {'version': "==3.4"},
+                }}))
+            with open(os.path.join(root_dir, "Pipfile"), "w") as f:
+                f.write('[packages]\nPyYAML = "*"\n')
+            Flake8Checker.root_dir = root_dir
+            with mock.patch('flake8_requirements.checker.LOG') as log:
+                mods = Flake8Checker.get_mods_3rd_party(False)
+                # Missing requirements.txt is not an error in such a case.
+                log.error.assert_not_called()
+            self.assertEqual(
+                {k: v.name for k, v in mods.items()},
+                {("yaml",): "PyYAML"})
+
+    def test_requirements_file(self):
+        with tempfile.TemporaryDirectory() as root_dir:
+            with open(os.path.join(root_dir, "requirements.txt"), "w") as f:
+                f.write("foo\n")
+            with open(os.path.join(root_dir, "uv.lock"), "w") as f:
+                f.write("\n".join((
+                    "[[package]]",
+                    'name = "project"',
+                    'source = { virtual = "." }',
+                    'dependencies = [{ name = "bar" }]',
+                )))
+            Flake8Checker.root_dir = root_dir
+            Flake8Checker.requirements_file = "uv.lock"
+            mods = Flake8Checker.get_mods_3rd_party(False)
+            self.assertEqual(list(mods), [("bar",)])
@@ -8,12 +8,7 @@ from flake8_requirements.checker import ModuleSet
 from flake8_requirements.checker import memoize
 from flake8_requirements.checker import parse_requirements
 
-
-class Flake8Options:
-    known_modules = ""
-    requirements_file = None
-    requirements_max_depth = 1
-    scan_host_site_packages = False
+from options import Flake8Options  # noqa: I900
 
 
 class Pep621TestCase(unittest.TestCase):
@@ -28,7 +23,7 @@ class Pep621TestCase(unittest.TestCase):
     """
 
     def setUp(self):
-        memoize.mem = {}
+        memoize.cache.clear()
 
     def tearDown(self):
         Flake8Checker.root_dir = ""
@@ -69,7 +64,7 @@ class Pep621TestCase(unittest.TestCase):
 
             checker = Flake8Checker(None, None)
             mods = checker.get_mods_1st_party()
-            self.assertEqual(mods, ModuleSet({"test": {}}))
+            self.assertEqual(mods, ModuleSet({("test",): True}))
 
     def test_3rd_party(self):
         with mock.patch('builtins.open', mock_open()) as m:
@@ -81,7 +76,9 @@ class Pep621TestCase(unittest.TestCase):
 
             checker = Flake8Checker(None, None)
             mods = checker.get_mods_3rd_party(False)
-            self.assertEqual(mods, ModuleSet({"tools": {}, "dev_tools": {}}))
+            self.assertEqual(
+                {k: v.name for k, v in mods.items()},
+                {("tools",): "tools", ("dev_tools",): "dev-tools"})
 
     def test_dynamic_requirements(self):
         requirements_content = "package1\npackage2>=2.0"
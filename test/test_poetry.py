@@ -10,7 +10,7 @@ from flake8_requirements.checker import memoize
 class PoetryTestCase(unittest.TestCase):
 
     def setUp(self):
-        memoize.mem = {}
+        memoize.cache.clear()
 
     def test_get_pyproject_toml_poetry(self):
         content = b"[tool.poetry]\nname='x'\n[tool.poetry.tag]\nx=0\n"
@@ -30,7 +30,7 @@ class PoetryTestCase(unittest.TestCase):
 
             checker = Flake8Checker(None, None)
             mods = checker.get_mods_1st_party()
-            self.assertEqual(mods, ModuleSet({"book": {}}))
+            self.assertEqual(mods, ModuleSet({("book",): True}))
 
     def test_3rd_party(self):
         content = b"[tool.poetry.dependencies]\ntools='1.0'\n"
@@ -45,7 +45,9 @@ class PoetryTestCase(unittest.TestCase):
 
             checker = Flake8Checker(None, None)
             mods = checker.get_mods_3rd_party(False)
-            self.assertEqual(mods, ModuleSet({"tools": {}, "dev_tools": {}}))
+            self.assertEqual(
+                {k: v.name for k, v in mods.items()},
+                {("tools",): "tools", ("dev_tools",): "dev-tools"})
 
     def test_3rd_party_groups(self):
         content = b"[tool.poetry.dependencies]\ntools='1.0'\n"
@@ -60,4 +62,6 @@ class PoetryTestCase(unittest.TestCase):
 
             checker = Flake8Checker(None, None)
             mods = checker.get_mods_3rd_party(False)
-            self.assertEqual(mods, ModuleSet({"tools": {}, "dev_tools": {}}))
+            self.assertEqual(
+                {k: v.name for k, v in mods.items()},
+                {("tools",): "tools", ("dev_tools",): "dev-tools"})
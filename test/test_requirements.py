@@ -4,7 +4,10 @@ from collections import OrderedDict
 from unittest import mock
 from unittest.mock import mock_open
 
+from packaging.requirements import Requirement
+
 from flake8_requirements.checker import Flake8Checker
+from flake8_requirements.checker import load_requirement
 from flake8_requirements.checker import memoize
 from flake8_requirements.checker import parse_requirements
 
@@ -29,7 +32,32 @@ def mock_open_multiple(files=OrderedDict()):
 class RequirementsTestCase(unittest.TestCase):
 
     def setUp(self):
-        memoize.mem = {}
+        memoize.cache.clear()
+
+    def test_load_requirement(self):
+        requirement = load_requirement("Foo_Bar[baz, qux] >= 1.0, < 2.0")
+        self.assertEqual(requirement.name, "Foo_Bar")
+        self.assertIsNone(requirement.requirement)
+        self.assertEqual(
+            requirement, Requirement("Foo_Bar[baz,qux]>=1.0,<2.0"))
+        self.assertIsNotNone(requirement.requirement)
+        # Parsed requirements are shared between sources.
+        self.assertIs(load_requirement("foo==1"), load_requirement("foo==1"))
+
+    def test_load_requirement_full(self):
+        requirement = load_requirement("foo ; python_version < '3.8'")
+        self.assertEqual(requirement.name, "foo")
+        self.assertEqual(str(requirement.marker), 'python_version < "3.8"')
+        requirement = load_requirement("foo @ https://example.com/foo.zip")
+        self.assertEqual(requirement.url, "https://example.com/foo.zip")
+        self.assertIsNone(load_requirement("foo >="))
+        self.assertIsNone(load_requirement("foo bar"))
+
+    def test_load_requirement_invalid_specifier(self):
+        requirement = load_requirement("foo >= 1.*")
+        self.assertEqual(requirement.name, "foo")
+        # Accessing specifier shall not raise, even if it is not valid.
+        self.assertIsNotNone(requirement.specifier)
 
     def test_resolve_requirement(self):
         self.assertEqual(
@@ -90,11 +118,53 @@ class RequirementsTestCase(unittest.TestCase):
 
     def test_resolve_requirement_with_file_recursion_beyond_max_depth(self):
         with mock.patch('builtins.open', mock_open_multiple(files=OrderedDict((
-            ("requirements.txt", "-r requirements.txt\n"),
+            ("requirements.txt", "-r inner.txt\n"),
+            ("inner.txt", "-r requirements.txt\n"),
         )))):
             with self.assertRaises(RuntimeError):
                 Flake8Checker.resolve_requirement("-r requirements.txt", 1),
 
+    def test_resolve_requirement_with_file_recursion_cycle(self):
+        with mock.patch('builtins.open', mock_open_multiple(files=OrderedDict((
+            ("requirements.txt", "-r inner.txt\nfoo\n"),
+            ("inner.txt", "-r requirements.txt\nbar\n"),
+        )))) as m:
+            self.assertEqual(
+                Flake8Checker.resolve_requirement("-r requirements.txt", 9),
+                ["bar", "foo"],
+            )
+            self.assertEqual(m.call_count, 2)
+
+    def test_resolve_requirement_with_file_included_twice(self):
+        with mock.patch('builtins.open', mock_open_multiple(files=OrderedDict((
+            ("requirements.txt", "-r a.txt\n-r b.txt\n-r ./common.txt\n"),
+            ("a.txt", "-r common.txt\nfoo\n"),
+            ("common.txt", "bar\n"),
+            ("b.txt", "-r common.txt\nbaz\n"),
+        )))) as m:
+            self.assertEqual(
+                Flake8Checker.resolve_requirement("-r requirements.txt", 3),
+                ["bar", "foo", "baz"],
+            )
+            self.assertEqual(m.call_count, 4)
+            # Files are parsed once per run.
+            self.assertEqual(
+                Flake8Checker.resolve_requirement("-r requirements.txt", 3),
+                ["bar", "foo", "baz"],
+            )
+            self.assertEqual(m.call_count, 4)
+
+    def test_resolve_requirement_with_constraints(self):
+        with mock.patch('builtins.open', mock_open_multiple(files=OrderedDict((
+            ("requirements.txt", "foo\n--constraint constraints.txt\n"),
+            ("constraints.txt", "-c other.txt\nfoo < 2.0\nbar == 1.0\n"),
+            ("other.txt", "foo >= 1.0\n"),
+        )))):
+            self.assertEqual(
+                Flake8Checker.resolve_requirement("-r requirements.txt", 3),
+                ["foo"],
+            )
+
     def test_resolve_requirement_with_file_recursion(self):
         with mock.patch('builtins.open', mock_open_multiple(files=OrderedDict((
             ("requirements.txt", "--requirement inner.txt\nbar <= 1.0.0\n"),
@@ -195,6 +265,28 @@ class RequirementsTestCase(unittest.TestCase):
                 ])),
             )
 
+    def test_init_with_constraints(self):
+        with mock.patch('builtins.open', mock_open_multiple(files=OrderedDict((
+            ("requirements.txt", "-c constraints.txt\nfoo\nbar >= 1.0\n"),
+            ("constraints.txt", "foo == 1.2\nbar < 2.0\nbaz == 3\n"),
+        )))):
+            checker = Flake8Checker(None, None)
+            self.assertEqual(
+                [str(x) for x in checker.get_requirements_txt()],
+                ["foo", "bar>=1.0"],
+            )
+
+    def test_init_with_constraints_included_as_requirements(self):
+        with mock.patch('builtins.open', mock_open_multiple(files=OrderedDict((
+            ("requirements.txt", "-c base.txt\n-r base.txt\npytest\n"),
+            ("base.txt", "requests == 2.0\n"),
+        )))):
+            checker = Flake8Checker(None, None)
+            self.assertEqual(
+                [str(x) for x in checker.get_requirements_txt()],
+                ["requests==2.0", "pytest"],
+            )
+
     def test_init_misc(self):
         curdir = os.path.abspath(os.path.dirname(__file__))
         with open(os.path.join(curdir, "test_requirements.txt")) as f:
@@ -1,11 +1,14 @@
 import ast
 import os
+import tempfile
 import unittest
 from unittest import mock
 from unittest.mock import mock_open
 
 from flake8_requirements.checker import Flake8Checker
+from flake8_requirements.cache import IndexCache
 from flake8_requirements.checker import SetupVisitor
+from flake8_requirements.checker import memoize
 from flake8_requirements.checker import parse_requirements
 
 
@@ -70,6 +73,55 @@ class SetupTestCase(unittest.TestCase):
         ))), "")
         self.assertEqual(setup.redirected, False)
 
+    def test_static_keywords(self):
+        code = "\n".join((
+            "import setuptools as st",
+            "from setuptools import setup",
+            "REQUIRES = ['foo', 'bar']",
+            "EXTRAS = {'test': ['pytest']}",
+            "raise RuntimeError('Executed')",
+            "setup({})".format(",".join((
+                "name='A'",
+                "version='1'",
+                "packages=['']",
+                "install_requires=[*REQUIRES, 'baz'] + ['qux']",
+                "long_description=open('README').read()",
+                "**{'extras_require': EXTRAS}",
+            ))),
+        ))
+        setup = SetupVisitor(ast.parse(code), "")
+        self.assertEqual(setup.redirected, True)
+        self.assertDictEqual(setup.keywords, {
+            'name': 'A',
+            'version': '1',
+            'packages': [''],
+            'install_requires': ['foo', 'bar', 'baz', 'qux'],
+            'extras_require': {'test': ['pytest']},
+        })
+        setup = SetupVisitor(ast.parse(code.replace(
+            "from setuptools import setup", "").replace(
+            "setup(", "st.setup(")), "")
+        self.assertEqual(setup.redirected, True)
+        self.assertEqual(setup.keywords['name'], 'A')
+
+    def test_static_keywords_dynamic(self):
+        code = "\n".join((
+            "from setuptools import setup",
+            "REQUIRES = ['foo']",
+            "REQUIRES.append('bar')",
+            "setup({})".format(",".join((
+                "name='A'",
+                "version='1'",
+                "packages=['']",
+                "url='URL'",
+                "install_requires=REQUIRES",
+            ))),
+        ))
+        # Fall back to the setup.py evaluation.
+        setup = SetupVisitor(ast.parse(code), "")
+        self.assertEqual(setup.redirected, True)
+        self.assertEqual(setup.keywords['install_requires'], ['foo', 'bar'])
+
     def test_get_requirements(self):
         setup = SetupVisitor(ast.parse("setup(**{})".format(str({
             'name': 'A',
@@ -106,3 +158,79 @@ class SetupTestCase(unittest.TestCase):
                     "docutils>=0.3",
                 ])),
             )
+
+    def test_evaluate_isolated(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "requirements.txt"), "w") as f:
+                f.write("foo\nbar\n")
+            source = "\n".join((
+                "print('noise')",
+                "with open('requirements.txt') as f:",
+                "    requires = {x.strip() for x in f}",
+                "setup({})".format(",".join((
+                    "name='A'",
+                    "version='1'",
+                    "packages=['']",
+                    "install_requires=requires",
+                    "cmdclass={'x': object}",
+                ))),
+            ))
+            result = SetupVisitor.evaluate_isolated(source, tmp, 10)
+            self.assertDictEqual(result['keywords'], {
+                'name': 'A',
+                'version': '1',
+                'packages': [''],
+                'install_requires': ["bar", "foo"],
+            })
+            self.assertEqual(result['files'], [
+                os.path.join(os.path.realpath(tmp), "requirements.txt"),
+            ])
+
+    def test_evaluate_in_process(self):
+        code = "setup({})".format(",".join((
+            "name='A'",
+            "version='1'",
+            "author='A'",
+            "packages=['']",
+            "url='URL'",
+        )))
+        # Audit hooks can not be removed, so they shall not be installed
+        # in the flake8 process.
+        with mock.patch('sys.addaudithook') as m:
+            setup = SetupVisitor(ast.parse(code), "")
+            m.assert_not_called()
+        self.assertTrue(setup.redirected)
+        self.assertTrue(setup.evaluated)
+
+    def test_evaluate_isolated_timeout(self):
+        source = "import time\ntime.sleep(10)\nsetup({})".format(",".join((
+            "name='A'",
+            "version='1'",
+            "author='A'",
+            "packages=['']",
+            "url='URL'",
+        )))
+        self.assertIsNone(SetupVisitor.evaluate_isolated(source, "", 0.5))
+
+    def test_get_setup_py_isolated_cached(self):
+        source = "setup(name='A', version='1', packages=[''], url='', x=1)"
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "setup.py"), "w") as f:
+                f.write(source)
+            try:
+                Flake8Checker.root_dir = tmp
+                Flake8Checker.setup_py_timeout = 10
+                Flake8Checker.index_cache = IndexCache(tmp)
+                memoize.cache.clear()
+                self.assertEqual(
+                    Flake8Checker.get_setup_py().keywords['name'], 'A')
+                # The second evaluation shall be taken from the cache.
+                memoize.cache.clear()
+                with mock.patch.object(SetupVisitor, 'evaluate_isolated') as m:
+                    self.assertEqual(
+                        Flake8Checker.get_setup_py().keywords['name'], 'A')
+                    m.assert_not_called()
+            finally:
+                Flake8Checker.root_dir = ""
+                Flake8Checker.setup_py_timeout = 0
+                Flake8Checker.index_cache = None
@@ -0,0 +1,125 @@
+import ast
+import json
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from flake8_requirements.checker import Flake8Checker
+from flake8_requirements.checker import memoize
+from flake8_requirements.checker import timed
+from flake8_requirements.stats import Stats
+
+from options import Flake8Options  # noqa: I900
+
+
+class StatsTestCase(unittest.TestCase):
+
+    def test_merge(self):
+        stats = Stats()
+        stats.add_time("phase", 0.5)
+        stats.count("counter", 2)
+        other = Stats()
+        other.merge(stats.dump())
+        other.merge(stats.dump())
+        self.assertEqual(other.dump(), {
+            'phases': {'phase': {'calls': 2, 'seconds': 1.0}},
+            'counters': {'counter': 4},
+        })
+
+    def test_format_benchmarks(self):
+        stats = Stats()
+        stats.add_time("phase", 0.25)
+        stats.count("counter", 3)
+        self.assertEqual(stats.format_benchmarks(), "".join((
+            "1          requirements phase calls\n",
+            "0.25       requirements phase seconds\n",
+            "3          requirements counter\n",
+        )))
+
+
+class ResolutionStatsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        memoize.cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root_dir = os.path.realpath(self.tmp.name)
+        with open(os.path.join(self.root_dir, "requirements.txt"), "w") as f:
+            f.write("foo\nbar\n")
+        self.stats_file = os.path.join(self.root_dir, "stats.json")
+        options = Flake8Options()
+        options.requirements_stats_file = self.stats_file
+        with mock.patch('os.getcwd', return_value=self.root_dir), \
+                mock.patch('atexit.register') as m:
+            Flake8Checker.parse_options(options)
+            # The multiprocessing module registers its own exit handler
+            # when it is imported for the first time.
+            m.assert_any_call(Flake8Checker.report_run, None)
+
+    def tearDown(self):
+        Flake8Checker.finish_run()
+        Flake8Checker.run_dir = None
+        Flake8Checker.stats_file = None
+        Flake8Checker.root_dir = ""
+        timed.stats = None
+        self.tmp.cleanup()
+
+    def check(self, code, filename="test.py"):
+        filename = os.path.join(self.root_dir, filename)
+        return list(Flake8Checker(ast.parse(code), filename).run())
+
+    def report(self):
+        Flake8Checker.report_run()
+        with open(self.stats_file) as f:
+            return json.load(f)
+
+    def test_stats(self):
+        self.check("import foo\nimport foo\nimport baz")
+        stats = self.report()
+        phases = stats['phases']
+        self.assertEqual(phases['Flake8Checker.get_index']['calls'], 1)
+        # Requirements are resolved for regular files and setup.py.
+        self.assertEqual(
+            phases['Flake8Checker.get_requirements_txt']['calls'], 2)
+        self.assertEqual(phases['ModuleSet.lookup']['calls'], 3)
+        self.assertEqual(stats['counters']['processes'], 1)
+        self.assertEqual(stats['counters']['imports'], 3)
+        self.assertEqual(stats['counters']['verdict cache hits'], 1)
+        self.assertEqual(stats['counters']['verdict cache misses'], 2)
+        self.assertIsNone(Flake8Checker.run_dir)
+
+    def test_stats_disabled(self):
+        Flake8Checker.finish_run()
+        Flake8Checker.run_dir = None
+        with mock.patch('os.getcwd', return_value=self.root_dir):
+            Flake8Checker.parse_options(Flake8Options())
+        self.assertIsNone(timed.stats)
+        self.assertEqual(len(self.check("import baz")), 1)
+
+    def test_stats_multiple_processes(self):
+        self.check("import foo")
+        ctx = multiprocessing.get_context("fork")
+        worker = ctx.Process(
+            target=self.check, args=("import bar\nimport os",))
+        worker.start()
+        worker.join()
+        self.assertEqual(worker.exitcode, 0)
+        stats = self.report()
+        phases = stats['phases']
+        # Requirements are resolved once, by the main process.
+        self.assertEqual(phases['Flake8Checker.get_index']['calls'], 1)
+        self.assertEqual(stats['counters']['processes'], 2)
+        self.assertEqual(stats['counters']['imports'], 3)
+
+    def test_benchmark(self):
+        Flake8Checker.benchmark = True
+        try:
+            self.check("import foo")
+            output = os.path.join(self.root_dir, "output.txt")
+            Flake8Checker.report_run(output)
+        finally:
+            Flake8Checker.benchmark = False
+        with open(output) as f:
+            lines = f.read().splitlines()
+        self.assertIn("1          requirements imports", lines)
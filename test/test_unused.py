@@ -0,0 +1,155 @@
+import ast
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from flake8_requirements.checker import Flake8Checker
+from flake8_requirements.checker import memoize
+
+from options import Flake8Options  # noqa: I900
+
+
+class Options(Flake8Options):
+    extend_select = ["I901"]
+
+
+class UnusedRequirementsTestCase(unittest.TestCase):
+    """Not used requirements collected by the standalone checker."""
+
+    def setUp(self):
+        memoize.cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root_dir = os.path.realpath(self.tmp.name)
+        self.requirements = os.path.join(self.root_dir, "requirements.txt")
+        with open(self.requirements, "w") as f:
+            f.write("foo\nbar-baz >= 1.0  # comment\n\nQux\n")
+        with mock.patch('os.getcwd', return_value=self.root_dir), \
+                mock.patch('atexit.register') as m:
+            Flake8Checker.parse_options(Options)
+            m.assert_called_once()
+
+    def tearDown(self):
+        if Flake8Checker.run_dir is not None:
+            Flake8Checker.run_dir.cleanup()
+        Flake8Checker.run_dir = None
+        Flake8Checker.error_I901_enabled = False
+        Flake8Checker.root_dir = ""
+        self.tmp.cleanup()
+
+    def check(self, code, filename="test.py"):
+        filename = os.path.join(self.root_dir, filename)
+        return list(Flake8Checker(ast.parse(code), filename).run())
+
+    def test_unused(self):
+        self.assertEqual(len(self.check("import foo\nimport os")), 0)
+        self.assertEqual(Flake8Checker.get_unused_requirements(), [
+            (self.requirements, 2, 1, "I901 'bar-baz' required but not used"),
+            (self.requirements, 4, 1, "I901 'qux' required but not used"),
+        ])
+
+    def test_unused_none_imported(self):
+        self.assertEqual(len(self.check("import os")), 0)
+        self.assertEqual(len(Flake8Checker.get_unused_requirements()), 3)
+
+    def test_unused_multiple_processes(self):
+        self.check("import foo")
+        ctx = multiprocessing.get_context("fork")
+        worker = ctx.Process(target=self.check, args=("import bar_baz.x",))
+        worker.start()
+        worker.join()
+        self.assertEqual(worker.exitcode, 0)
+        self.assertEqual(Flake8Checker.get_unused_requirements(), [
+            (self.requirements, 4, 1, "I901 'qux' required but not used"),
+        ])
+
+    def test_report(self):
+        self.check("import foo\nimport bar_baz\nimport qux")
+        run_dir = Flake8Checker.run_dir.path
+        output = os.path.join(self.root_dir, "output.txt")
+        Flake8Checker.report_run(output)
+        self.assertFalse(os.path.exists(output))
+        self.assertFalse(os.path.exists(run_dir))
+        self.assertIsNone(Flake8Checker.run_dir)
+
+
+class UnusedRequirementsFlake8TestCase(unittest.TestCase):
+    """Not used requirements reported as flake8 results."""
+
+    def setUp(self):
+        memoize.cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root_dir = os.path.realpath(self.tmp.name)
+        self.write("requirements.txt", "foo\nbar-baz >= 1.0\n\nQux\n")
+        self.write("a.py", "import foo\n")
+        os.mkdir(os.path.join(self.root_dir, "pkg"))
+        self.write(os.path.join("pkg", "b.py"), "import qux\n")
+
+    def tearDown(self):
+        Flake8Checker.error_I901_enabled = False
+        Flake8Checker.checked_files = None
+        Flake8Checker.root_dir = ""
+        self.tmp.cleanup()
+
+    def write(self, path, content):
+        with open(os.path.join(self.root_dir, path), "w") as f:
+            f.write(content)
+
+    def parse_options(self):
+        class FilesOptions(Options):
+            filenames = [self.root_dir]
+        with mock.patch('os.getcwd', return_value=self.root_dir), \
+                mock.patch('atexit.register') as m:
+            Flake8Checker.parse_options(FilesOptions)
+            # Errors are reported by flake8, not at exit.
+            m.assert_not_called()
+        self.assertIsNone(Flake8Checker.run_dir)
+
+    def check(self, path):
+        filename = os.path.join(self.root_dir, path)
+        with open(filename) as f:
+            tree = ast.parse(f.read())
+        return [x[:3] for x in Flake8Checker(tree, filename).run()]
+
+    def test_unused(self):
+        self.parse_options()
+        # Errors are reported against the first checked file.
+        self.assertEqual(self.check("a.py"), [
+            (1, 0, "I901 'bar-baz' required but not used "
+             "(requirements.txt:2)"),
+        ])
+        self.assertEqual(self.check(os.path.join("pkg", "b.py")), [])
+
+    def test_unused_setup_py(self):
+        self.write("setup.py", "\n".join((
+            "from setuptools import setup",
+            "setup(",
+            "    name='project',",
+            "    install_requires=[",
+            "        'foo',",
+            "        'bar-baz >= 1.0',",
+            "        'qux',",
+            "    ],",
+            ")",
+        )))
+        self.parse_options()
+        self.assertEqual(self.check("a.py"), [])
+        self.assertEqual(self.check("setup.py"), [
+            (6, 9, "I901 'bar-baz' required but not used"),
+        ])
+
+    def test_flake8(self):
+        # Do not measure code coverage of the subprocess.
+        env = {k: v for k, v in os.environ.items() if not k.startswith("COV_")}
+        p = subprocess.run(
+            [sys.executable, "-m", "flake8", "--select=I9", "--count", "."],
+            capture_output=True, cwd=self.root_dir, env=env, text=True)
+        self.assertEqual(p.returncode, 1)
+        self.assertEqual(p.stdout.splitlines(), [
+            "./a.py:1:1: I901 'bar-baz' required but not used "
+            "(requirements.txt:2)",
+            "1",
+        ])